@@ -0,0 +1,30 @@
+"""add (created_at, id) index to tasks
+
+Revision ID: 7cdde3b42e8f
+Revises: 042598a75103
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7cdde3b42e8f"
+down_revision: str | Sequence[str] | None = "042598a75103"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Scanned backwards for ORDER BY created_at DESC, id DESC
+    op.create_index(
+        "ix_tasks_created_at_id", "tasks", ["created_at", "id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_tasks_created_at_id", table_name="tasks")
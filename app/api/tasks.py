@@ -1,13 +1,16 @@
 """Task API endpoints."""
 
+import base64
+import binascii
 from datetime import datetime
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel
 
 from app.core.auth import verify_api_key
 from app.core.errors import NotFoundError
+from app.models import Task
 from app.services import TaskService
 
 router = APIRouter()
@@ -40,9 +43,11 @@ class TaskListResponse(BaseModel):
     """Response model for list of tasks."""
 
     tasks: list[TaskResponse]
+    # May lag tasks created by other workers by up to TASK_COUNT_TTL seconds
     total: int
     limit: int
     offset: int
+    next_cursor: str | None = None
 
 
 class TaskLogResponse(BaseModel):
@@ -84,6 +89,31 @@ class TaskSessionResponse(BaseModel):
     session_data: str
 
 
+def _encode_cursor(task: Task) -> str:
+    """Encode a task's position in the newest-first listing as an opaque cursor.
+
+    URL-safe base64 keeps the "+" of the timestamp's UTC offset out of query
+    strings, and keeps the sort key from becoming part of the API contract.
+    """
+    raw = f"{task.created_at.isoformat()},{task.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """Decode a cursor from _encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed (binascii.Error included)
+    """
+    raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+    timestamp, _, task_id = raw.partition(",")
+    created_at = datetime.fromisoformat(timestamp)
+    # created_at is timestamptz; Postgres would read a naive value as local time
+    if created_at.tzinfo is None:
+        raise ValueError("cursor timestamp has no time zone")
+    return created_at, UUID(task_id)
+
+
 @router.post("/tasks", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
 def create_task(task_data: TaskCreate, api_key: str = Depends(verify_api_key)):
     """Create a new task."""
@@ -134,10 +164,25 @@ def get_task(task_id: UUID, api_key: str = Depends(verify_api_key)):
 
 @router.get("/tasks", response_model=TaskListResponse)
 def list_tasks(
-    limit: int = 100, offset: int = 0, api_key: str = Depends(verify_api_key)
+    limit: int = Query(100, ge=1),
+    offset: int = Query(0, ge=0),
+    cursor: str | None = None,
+    api_key: str = Depends(verify_api_key),
 ):
-    """List all tasks with pagination."""
-    tasks, total = TaskService.list_tasks(limit=limit, offset=offset)
+    """List all tasks with pagination.
+
+    Pass the next_cursor of the previous page as cursor to fetch the next
+    page without an OFFSET scan; offset is ignored when cursor is set.
+    """
+    try:
+        task_cursor = _decode_cursor(cursor) if cursor is not None else None
+    except (binascii.Error, ValueError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid cursor: {cursor}",
+        ) from e
+
+    tasks = TaskService.list_tasks(limit=limit, offset=offset, cursor=task_cursor)
 
     task_responses = [
         TaskResponse(
@@ -157,23 +202,26 @@ def list_tasks(
 
     return TaskListResponse(
         tasks=task_responses,
-        total=total,
+        total=TaskService.count_tasks(),
         limit=limit,
         offset=offset,
+        next_cursor=(
+            _encode_cursor(tasks[-1]) if tasks and len(tasks) == limit else None
+        ),
     )
 
 
 @router.get("/tasks/{task_id}/logs", response_model=TaskLogListResponse)
 def get_task_logs(
     task_id: UUID,
-    limit: int = 100,
-    offset: int = 0,
+    limit: int = Query(100, ge=1),
+    offset: int = Query(0, ge=0),
     api_key: str = Depends(verify_api_key),
 ):
     """Get logs for a task from filesystem with pagination."""
     try:
         # Get logs from filesystem
-        logs, total = TaskService.get_task_logs(task_id, limit=limit, offset=offset)
+        logs = TaskService.get_task_logs(task_id, limit=limit, offset=offset)
     except NotFoundError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -185,7 +233,7 @@ def get_task_logs(
 
     return TaskLogListResponse(
         logs=log_responses,
-        total=total,
+        total=TaskService.count_task_logs(task_id),
         limit=limit,
         offset=offset,
     )
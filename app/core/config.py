@@ -33,6 +33,9 @@ class Settings(BaseModel):
     claude_code_oauth_token: str | None = os.getenv("CLAUDE_CODE_OAUTH_TOKEN")
     github_token: str | None = os.getenv("GITHUB_TOKEN")
 
+    # Task logs, session files and extracted files, one directory per task
+    task_logs_dir: str = os.getenv("TASK_LOGS_DIR", "logs/tasks")
+
     # Timeouts (in seconds)
     sandbox_timeout: int = int(os.getenv("SANDBOX_TIMEOUT", "600"))  # 10 minutes
     claude_code_timeout: int = int(os.getenv("CLAUDE_CODE_TIMEOUT", "300"))  # 5 minutes
@@ -4,7 +4,6 @@ from contextlib import contextmanager
 
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import Session, sessionmaker
-from sqlalchemy.pool import NullPool
 from sqlmodel import SQLModel
 
 from app.core.config import settings
@@ -18,17 +17,10 @@ def get_engine():
     global _engine, _session_maker
 
     if _engine is None:
-        database_url = settings.database_url
-
-        pool_kwargs = {}
-        if settings.env == "test":
-            pool_kwargs["poolclass"] = NullPool
-
         _engine = create_engine(
-            database_url,
+            settings.database_url,
             echo=False,
             pool_pre_ping=True,
-            **pool_kwargs,
         )
 
         _session_maker = sessionmaker(
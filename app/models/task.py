@@ -3,7 +3,7 @@
 from datetime import UTC, datetime
 from uuid import UUID, uuid4
 
-from sqlalchemy import Column, DateTime, String
+from sqlalchemy import Column, DateTime, Index, String
 from sqlmodel import Field, SQLModel
 
 
@@ -11,6 +11,8 @@ class Task(SQLModel, table=True):
     """Task for agent execution."""
 
     __tablename__ = "tasks"
+    # Serves newest-first listing and keyset pagination in TaskService.list_tasks
+    __table_args__ = (Index("ix_tasks_created_at_id", "created_at", "id"),)
 
     # Primary key and timestamps
     id: UUID = Field(
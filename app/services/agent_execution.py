@@ -4,6 +4,7 @@ import logging
 from pathlib import Path
 from uuid import UUID
 
+from app.core.config import settings
 from app.services.sandbox import SandboxService
 from app.services.task import TaskService
 
@@ -119,7 +120,7 @@ class AgentExecutionService:
 
                 # Restore files from parent task
                 parent_files_dir = (
-                    Path("logs/tasks") / str(task.parent_task_id) / "files"
+                    Path(settings.task_logs_dir) / str(task.parent_task_id) / "files"
                 )
                 if parent_files_dir.exists():
                     logger.info(f"Restoring files from {parent_files_dir}")
@@ -137,7 +138,9 @@ class AgentExecutionService:
                 # Restore session file for conversation resumption
                 if resume_session_id:
                     parent_session_file = (
-                        Path("logs/tasks") / str(task.parent_task_id) / "session.jsonl"
+                        Path(settings.task_logs_dir)
+                        / str(task.parent_task_id)
+                        / "session.jsonl"
                     )
                     if parent_session_file.exists():
                         logger.info(f"Restoring session file for {resume_session_id}")
@@ -188,7 +191,7 @@ class AgentExecutionService:
 
                 if status_result.stdout.strip():
                     # Create task files directory
-                    task_dir = Path("logs/tasks") / str(task_id) / "files"
+                    task_dir = Path(settings.task_logs_dir) / str(task_id) / "files"
                     task_dir.mkdir(parents=True, exist_ok=True)
 
                     # Extract each modified/new file
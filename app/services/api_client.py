@@ -1,17 +1,119 @@
 """API client service for interacting with Cloud Agent API."""
 
+import asyncio
+import contextlib
+import functools
 import os
+import random
+import threading
 import time
+from dataclasses import dataclass, field
 from typing import Any
 
 import httpx
 
 from app.api.tasks import TaskResponse
 
+# Task statuses after which wait_for_task stops polling
+TERMINAL_STATUSES = frozenset({"completed", "failed", "cancelled"})
+
+
+def _poll_delay(
+    attempt: int, poll_interval: float, max_interval: float, factor: float = 1.5
+) -> float:
+    """Backoff delay before the next status check, with +/-20% jitter."""
+    delay = min(max_interval, poll_interval * factor**attempt)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def _is_transient(error: httpx.HTTPError) -> bool:
+    """Whether a failed status check is worth retrying (5xx or network error)."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500
+    return isinstance(error, httpx.TransportError)
+
+
+@dataclass
+class _PollSchedule:
+    """Polling policy shared by wait_for_task and wait_for_task_async.
+
+    The drivers only fetch the task and sleep; every decision about the
+    deadline, backoff and which errors to retry is made here.
+    """
+
+    task_id: str
+    timeout: float
+    poll_interval: float
+    max_interval: float
+    # Monotonic so wall-clock adjustments can't shorten or extend the wait
+    deadline: float = field(init=False)
+    attempt: int = 0
+    errors: int = 0
+
+    def __post_init__(self) -> None:
+        self.deadline = time.monotonic() + self.timeout
+
+    def start_poll(self) -> float:
+        """Return the start time of the next status check.
+
+        Raises:
+            TimeoutError: If the deadline has passed
+        """
+        poll_start = time.monotonic()
+        if poll_start >= self.deadline:
+            raise TimeoutError(
+                f"Task {self.task_id} did not complete within {self.timeout}s"
+            )
+        return poll_start
+
+    def next_delay(
+        self,
+        poll_start: float,
+        task: TaskResponse | None = None,
+        error: httpx.HTTPError | None = None,
+    ) -> float | None:
+        """Seconds to sleep before the next check, or None once task is terminal.
+
+        Pass the fetched task, or the error the status check raised.
+
+        Raises:
+            httpx.HTTPError: The given error, if it is not worth retrying
+        """
+        if error is not None:
+            if not _is_transient(error):
+                raise error
+            self.errors += 1
+            delay = _poll_delay(
+                self.errors - 1, self.poll_interval, self.max_interval, factor=2
+            )
+        else:
+            if task.status in TERMINAL_STATUSES:
+                return None
+            self.errors = 0
+            delay = _poll_delay(self.attempt, self.poll_interval, self.max_interval)
+            self.attempt += 1
+
+        # Count request latency against the delay so polls keep their cadence
+        return max(0.0, delay - (time.monotonic() - poll_start))
+
 
 class ApiClientService:
     """Service for Cloud Agent API client operations."""
 
+    # Lazily created by get_shared_client() and reused until close()
+    _shared_client: httpx.Client | None = None
+    # Guards _shared_client so concurrent first calls create only one client
+    _shared_client_lock = threading.Lock()
+
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _resolve_defaults() -> tuple[str, str]:
+        """Read the default base URL and API key from the environment once."""
+        return (
+            os.getenv("CLOUD_AGENT_URL", "http://localhost:8000"),
+            os.getenv("API_SECRET_KEY", ""),
+        )
+
     @staticmethod
     def get_client(
         base_url: str | None = None, api_key: str | None = None
@@ -23,19 +125,50 @@ class ApiClientService:
             api_key: API key for authentication (defaults to API_SECRET_KEY env var)
 
         Returns:
-            Configured httpx.Client with base_url, headers, and timeout
+            Configured httpx.Client with base_url, headers, timeout, and
+            keep-alive connection limits
         """
+        default_url, default_key = ApiClientService._resolve_defaults()
         if base_url is None:
-            base_url = os.getenv("CLOUD_AGENT_URL", "http://localhost:8000")
+            base_url = default_url
         if api_key is None:
-            api_key = os.getenv("API_SECRET_KEY", "")
+            api_key = default_key
 
         return httpx.Client(
             base_url=base_url,
             headers={"X-API-Key": api_key},
             timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=30),
         )
 
+    @staticmethod
+    def get_shared_client() -> httpx.Client:
+        """Get the process-wide HTTP client, creating it on first use.
+
+        Reusing one client keeps its connection pool warm, so repeated calls
+        (e.g. wait_for_task polling) skip a TCP/TLS handshake per request.
+        Callers must not close it; use close() instead.
+
+        Returns:
+            Shared httpx.Client configured from the environment
+        """
+        client = ApiClientService._shared_client
+        if client is None:
+            with ApiClientService._shared_client_lock:
+                client = ApiClientService._shared_client
+                if client is None:
+                    client = ApiClientService.get_client()
+                    ApiClientService._shared_client = client
+        return client
+
+    @staticmethod
+    def close() -> None:
+        """Close the shared HTTP client if one has been created."""
+        with ApiClientService._shared_client_lock:
+            if ApiClientService._shared_client is not None:
+                ApiClientService._shared_client.close()
+                ApiClientService._shared_client = None
+
     @staticmethod
     def create_task(
         prompt: str,
@@ -49,7 +182,7 @@ class ApiClientService:
             prompt: Natural language prompt for the task
             repository_url: Repository URL to clone
             parent_task_id: Optional parent task ID to resume from
-            client: Optional httpx.Client to use (if None, creates new client)
+            client: Optional httpx.Client to use (if None, uses the shared client)
 
         Returns:
             TaskResponse object with id, status, prompt, repository_url, etc.
@@ -57,24 +190,19 @@ class ApiClientService:
         Raises:
             httpx.HTTPStatusError: If API request fails
         """
-        should_close = client is None
         if client is None:
-            client = ApiClientService.get_client()
-
-        try:
-            payload: dict[str, Any] = {
-                "prompt": prompt,
-                "repository_url": repository_url,
-            }
-            if parent_task_id is not None:
-                payload["parent_task_id"] = parent_task_id
-
-            response = client.post("/v1/tasks", json=payload)
-            response.raise_for_status()
-            return TaskResponse(**response.json())
-        finally:
-            if should_close:
-                client.close()
+            client = ApiClientService.get_shared_client()
+
+        payload: dict[str, Any] = {
+            "prompt": prompt,
+            "repository_url": repository_url,
+        }
+        if parent_task_id is not None:
+            payload["parent_task_id"] = parent_task_id
+
+        response = client.post("/v1/tasks", json=payload)
+        response.raise_for_status()
+        return TaskResponse(**response.json())
 
     @staticmethod
     def get_task(task_id: str, client: httpx.Client | None = None) -> TaskResponse:
@@ -82,7 +210,7 @@ class ApiClientService:
 
         Args:
             task_id: Task ID to retrieve
-            client: Optional httpx.Client to use (if None, creates new client)
+            client: Optional httpx.Client to use (if None, uses the shared client)
 
         Returns:
             TaskResponse object with id, status, prompt, repository_url, etc.
@@ -90,48 +218,155 @@ class ApiClientService:
         Raises:
             httpx.HTTPStatusError: If API request fails (e.g., 404 for not found)
         """
-        should_close = client is None
         if client is None:
-            client = ApiClientService.get_client()
+            client = ApiClientService.get_shared_client()
 
-        try:
-            response = client.get(f"/v1/tasks/{task_id}")
-            response.raise_for_status()
-            return TaskResponse(**response.json())
-        finally:
-            if should_close:
-                client.close()
+        response = client.get(f"/v1/tasks/{task_id}")
+        response.raise_for_status()
+        return TaskResponse(**response.json())
 
     @staticmethod
     def wait_for_task(
         task_id: str,
         timeout: int = 600,
         poll_interval: int = 5,
+        max_interval: int = 30,
     ) -> TaskResponse:
         """Wait for task to complete with polling.
 
+        Polls quickly at first, then backs off exponentially (x1.5 per poll,
+        capped at max_interval) with +/-20% jitter so long tasks don't hammer
+        the API. Delays are measured from the start of each status check, so
+        request latency doesn't slow the polling cadence.
+
+        Server errors (5xx) and network errors are retried until the timeout,
+        backing off x2 per consecutive failure; other HTTP errors are raised.
+
         Args:
             task_id: Task ID to wait for
             timeout: Maximum time to wait in seconds (default: 600)
-            poll_interval: Time between status checks in seconds (default: 5)
+            poll_interval: Delay before the second status check in seconds
+                (default: 5)
+            max_interval: Upper bound on the delay between checks in seconds
+                (default: 30)
 
         Returns:
             Final TaskResponse when completed or failed
 
         Raises:
             TimeoutError: If task doesn't complete within timeout period
-            httpx.HTTPStatusError: If the API returns an error
+            httpx.HTTPStatusError: If the API returns a client error (4xx)
         """
-        start_time = time.time()
+        schedule = _PollSchedule(task_id, timeout, poll_interval, max_interval)
 
         while True:
-            if time.time() - start_time > timeout:
-                raise TimeoutError(f"Task {task_id} did not complete within {timeout}s")
+            poll_start = schedule.start_poll()
+            try:
+                task = ApiClientService.get_task(task_id)
+            except httpx.HTTPError as e:
+                delay = schedule.next_delay(poll_start, error=e)
+            else:
+                delay = schedule.next_delay(poll_start, task=task)
+                if delay is None:
+                    return task
+
+            time.sleep(delay)
+
+    @staticmethod
+    def get_async_client(
+        base_url: str | None = None, api_key: str | None = None
+    ) -> httpx.AsyncClient:
+        """Get configured async HTTP client.
+
+        Uses the same defaults as get_client, with a larger keep-alive pool so
+        many concurrent wait_for_task_async calls can share it.
+
+        Args:
+            base_url: API base URL (defaults to CLOUD_AGENT_URL env var or http://localhost:8000)
+            api_key: API key for authentication (defaults to API_SECRET_KEY env var)
+
+        Returns:
+            Configured httpx.AsyncClient with base_url, headers, timeout, and
+            keep-alive connection limits
+        """
+        default_url, default_key = ApiClientService._resolve_defaults()
+        if base_url is None:
+            base_url = default_url
+        if api_key is None:
+            api_key = default_key
+
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers={"X-API-Key": api_key},
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=50, keepalive_expiry=30),
+        )
+
+    @staticmethod
+    async def get_task_async(task_id: str, client: httpx.AsyncClient) -> TaskResponse:
+        """Get task by ID using an async client.
+
+        Args:
+            task_id: Task ID to retrieve
+            client: httpx.AsyncClient to use (see get_async_client)
+
+        Returns:
+            TaskResponse object with id, status, prompt, repository_url, etc.
+
+        Raises:
+            httpx.HTTPStatusError: If API request fails (e.g., 404 for not found)
+        """
+        response = await client.get(f"/v1/tasks/{task_id}")
+        response.raise_for_status()
+        return TaskResponse(**response.json())
+
+    @staticmethod
+    async def wait_for_task_async(
+        task_id: str,
+        timeout: int = 600,
+        poll_interval: int = 5,
+        max_interval: int = 30,
+        client: httpx.AsyncClient | None = None,
+    ) -> TaskResponse:
+        """Wait for task to complete without blocking the event loop.
+
+        Polls and retries on the same schedule as wait_for_task. To wait on many tasks at
+        once, pass one client to every call and run them with asyncio.gather.
+
+        Args:
+            task_id: Task ID to wait for
+            timeout: Maximum time to wait in seconds (default: 600)
+            poll_interval: Delay before the second status check in seconds
+                (default: 5)
+            max_interval: Upper bound on the delay between checks in seconds
+                (default: 30)
+            client: Optional httpx.AsyncClient to use (if None, creates and
+                closes one for this call)
+
+        Returns:
+            Final TaskResponse when completed or failed
+
+        Raises:
+            TimeoutError: If task doesn't complete within timeout period
+            httpx.HTTPStatusError: If the API returns a client error (4xx)
+        """
+        schedule = _PollSchedule(task_id, timeout, poll_interval, max_interval)
 
-            task = ApiClientService.get_task(task_id)
-            status = task.status
+        async with contextlib.AsyncExitStack() as stack:
+            if client is None:
+                client = await stack.enter_async_context(
+                    ApiClientService.get_async_client()
+                )
 
-            if status in ["completed", "failed", "cancelled"]:
-                return task
+            while True:
+                poll_start = schedule.start_poll()
+                try:
+                    task = await ApiClientService.get_task_async(task_id, client)
+                except httpx.HTTPError as e:
+                    delay = schedule.next_delay(poll_start, error=e)
+                else:
+                    delay = schedule.next_delay(poll_start, task=task)
+                    if delay is None:
+                        return task
 
-            time.sleep(poll_interval)
+                await asyncio.sleep(delay)
@@ -3,6 +3,10 @@
 import re
 import subprocess
 
+# org/repo from HTTPS (https://github.com/org/repo.git) or SSH
+# (git@github.com:org/repo.git) remotes, with or without .git
+_GITHUB_REPO_RE = re.compile(r"github\.com[:/](.+/.+?)(?:\.git)?$")
+
 
 class GitError(Exception):
     """Raised when git operations fail."""
@@ -31,29 +35,20 @@ class GitService:
                 text=True,
                 check=True,
             )
-            remote_url = result.stdout.strip()
-
-            # Parse org/name from URL
-            # Handles both HTTPS and SSH URLs:
-            # - https://github.com/org/repo.git
-            # - git@github.com:org/repo.git
-            match = re.search(r"github\.com[:/](.+/.+?)(?:\.git)?$", remote_url)
-            if not match:
-                raise GitError(
-                    f"Could not parse GitHub repo from remote URL: {remote_url}"
-                )
-
-            org_repo = match.group(1)
-
-            # Convert to HTTPS URL for use with GitHub token authentication
-            # SSH URLs (git@github.com:org/repo.git) won't work with token auth
-            repository_url = f"https://github.com/{org_repo}.git"
-
-            return repository_url, org_repo
-
         except subprocess.CalledProcessError as e:
             raise GitError("Not in a git repository or no remote 'origin' found") from e
 
+        remote_url = result.stdout.strip()
+
+        # parse_github_url returns an HTTPS URL for use with GitHub token
+        # authentication; SSH URLs (git@github.com:org/repo.git) won't work
+        try:
+            return GitService.parse_github_url(remote_url)
+        except ValueError:
+            raise GitError(
+                f"Could not parse GitHub repo from remote URL: {remote_url}"
+            ) from None
+
     @staticmethod
     def normalize_repo_url(repo: str) -> str:
         """Normalize repository input to HTTPS GitHub URL.
@@ -95,7 +90,7 @@ class GitService:
         Raises:
             ValueError: If URL cannot be parsed as a GitHub repository
         """
-        match = re.search(r"github\.com[:/](.+/.+?)(?:\.git)?$", repo)
+        match = _GITHUB_REPO_RE.search(repo)
         if not match:
             raise ValueError(f"Could not parse GitHub repo from URL: {repo}")
 
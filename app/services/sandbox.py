@@ -187,7 +187,7 @@ class SandboxService:
         # Store session file from Claude's project directory
         # Always read from filesystem instead of relying on JSON output
         # (which may not be available on timeout)
-        task_dir = Path("logs/tasks") / str(task_id)
+        task_dir = Path(settings.task_logs_dir) / str(task_id)
         task_dir.mkdir(parents=True, exist_ok=True)
 
         try:
@@ -2,20 +2,113 @@
 
 import json
 import logging
+import mmap
+import os
+import threading
+import time
+from array import array
+from collections.abc import Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import UTC, datetime
 from pathlib import Path
 from uuid import UUID
 
-from sqlalchemy import func
+from sqlalchemy import func, tuple_, update
 from sqlmodel import select
 
+from app.core.config import settings
 from app.core.database import get_session
 from app.core.errors import NotFoundError
 from app.models import Task
 
 logger = logging.getLogger(__name__)
 
+# Number of session files whose line offsets are kept between requests
+LOG_INDEX_CACHE_SIZE = 128
+
+# Session file path -> (st_mtime_ns, st_size, line starts, line ends)
+_log_index: dict[str, tuple[int, int, array, array]] = {}
+# Guards _log_index; requests run concurrently in FastAPI's threadpool
+_log_index_lock = threading.Lock()
+
+
+def _index_log_lines(mm: mmap.mmap) -> tuple[array, array]:
+    """Find the byte range of every non-blank line in a mapped JSONL file."""
+    starts = array("Q")
+    ends = array("Q")
+    size = len(mm)
+    pos = 0
+    while pos < size:
+        end = mm.find(b"\n", pos)
+        if end == -1:
+            end = size
+        if mm[pos:end].strip():
+            starts.append(pos)
+            ends.append(end)
+        pos = end + 1
+    return starts, ends
+
+
+def _get_log_index(
+    path: str, mtime_ns: int, size: int, mm: mmap.mmap
+) -> tuple[array, array]:
+    """Return cached line offsets for a session file, rebuilding if it changed."""
+    with _log_index_lock:
+        cached = _log_index.get(path)
+    if cached is not None and cached[:2] == (mtime_ns, size):
+        return cached[2], cached[3]
+
+    # Scan outside the lock so one large file doesn't stall other requests
+    starts, ends = _index_log_lines(mm)
+    with _log_index_lock:
+        _log_index.pop(path, None)
+        if len(_log_index) >= LOG_INDEX_CACHE_SIZE:
+            # Dicts keep insertion order, so this drops the least recently built
+            del _log_index[next(iter(_log_index))]
+        _log_index[path] = (mtime_ns, size, starts, ends)
+    return starts, ends
+
+
+@contextmanager
+def _map_log(log_file: Path) -> Iterator[tuple[bytes | mmap.mmap, array, array]]:
+    """Map a session file and yield it with its non-blank line offsets."""
+    with log_file.open("rb") as f:
+        # Stat the open file and key the index on the mapped length, so the
+        # cached offsets always describe the bytes that were scanned
+        stat = os.fstat(f.fileno())
+        if stat.st_size == 0:
+            # mmap refuses empty files
+            yield b"", array("Q"), array("Q")
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            starts, ends = _get_log_index(str(log_file), stat.st_mtime_ns, len(mm), mm)
+            yield mm, starts, ends
+
+
+def _clamp_offset(offset: int) -> int:
+    """Treat a negative page offset as 0.
+
+    Postgres rejects a negative OFFSET and a negative index would read the log
+    line arrays from the end, so both listings start from the first item.
+    """
+    return max(0, offset)
+
+
+# Seconds a cached task count may lag behind tasks inserted by other processes
+TASK_COUNT_TTL = 5.0
+
+# (time.monotonic() when counted, count), or None when unknown. Replaced as a
+# whole, so no lock is needed: racing threads at worst both run COUNT(*)
+_task_count: tuple[float, int] | None = None
+
+
+def _invalidate_task_count() -> None:
+    """Drop the cached task count once a new task has been committed."""
+    global _task_count
+    _task_count = None
+
 
 @dataclass
 class TaskFile:
@@ -45,6 +138,8 @@ class TaskService:
             )
             session.add(task)
             session.commit()
+            # After commit, so a concurrent count can't re-cache the old total
+            _invalidate_task_count()
             session.refresh(task)
 
             # Queue task for execution
@@ -68,23 +163,51 @@ class TaskService:
             return task
 
     @staticmethod
-    def list_tasks(limit: int = 100, offset: int = 0) -> tuple[list[Task], int]:
-        """List all tasks with pagination."""
+    def list_tasks(
+        limit: int = 100,
+        offset: int = 0,
+        cursor: tuple[datetime, UUID] | None = None,
+    ) -> list[Task]:
+        """List tasks with pagination, newest first.
+
+        Pass the (created_at, id) of the last task on the previous page as
+        cursor to seek to the next page through the (created_at, id) index
+        instead of skipping offset rows; offset is ignored when it is set,
+        and a negative offset is treated as 0.
+        Use count_tasks() for the total.
+        """
+        statement = select(Task).order_by(Task.created_at.desc(), Task.id.desc())
+        if cursor is not None:
+            statement = statement.where(
+                tuple_(Task.created_at, Task.id) < tuple_(*cursor)
+            )
+        else:
+            statement = statement.offset(_clamp_offset(offset))
+
         with get_session() as session:
-            # Get total count
-            count_statement = select(func.count()).select_from(Task)
-            total = session.execute(count_statement).scalar()
+            return list(session.execute(statement.limit(limit)).scalars())
 
-            # Get paginated results ordered by created_at desc
-            statement = (
-                select(Task)
-                .order_by(Task.created_at.desc())
-                .offset(offset)
-                .limit(limit)
-            )
-            tasks = session.execute(statement).scalars().all()
+    @staticmethod
+    def count_tasks() -> int:
+        """Count all tasks.
+
+        The count is cached for TASK_COUNT_TTL seconds, and dropped as soon
+        as create_task commits a task in this process, so paging through the
+        list does not run COUNT(*) for every page. Tasks inserted by other
+        processes can therefore be missing from it for up to TASK_COUNT_TTL
+        seconds.
+        """
+        global _task_count
+        if _task_count is not None:
+            counted_at, count = _task_count
+            if time.monotonic() - counted_at < TASK_COUNT_TTL:
+                return count
 
-            return list(tasks), total
+        with get_session() as session:
+            count = session.execute(select(func.count()).select_from(Task)).scalar()
+
+        _task_count = (time.monotonic(), count)
+        return count
 
     @staticmethod
     def update_task_status(
@@ -95,89 +218,99 @@ class TaskService:
         session_id: str | None = None,
     ) -> Task:
         """Update task status and result."""
+        values = {"status": status, "updated_at": datetime.now(UTC)}
+        if result is not None:
+            values["result"] = result
+        if sandbox_id is not None:
+            values["sandbox_id"] = sandbox_id
+        if session_id is not None:
+            values["session_id"] = session_id
+
         with get_session() as session:
-            statement = select(Task).where(Task.id == task_id)
+            # Single UPDATE ... RETURNING instead of SELECT then UPDATE
+            statement = (
+                update(Task).where(Task.id == task_id).values(**values).returning(Task)
+            )
             task = session.execute(statement).scalar_one_or_none()
 
             if task is None:
                 raise NotFoundError(f"Task with id {task_id} not found")
 
-            task.status = status
-            task.updated_at = datetime.now(UTC)
-            if result is not None:
-                task.result = result
-            if sandbox_id is not None:
-                task.sandbox_id = sandbox_id
-            if session_id is not None:
-                task.session_id = session_id
-
-            session.add(task)
             session.commit()
-            session.refresh(task)
             return task
 
     @staticmethod
-    def get_task_logs(
-        task_id: UUID, limit: int = 100, offset: int = 0
-    ) -> tuple[list[dict], int]:
+    def get_task_logs(task_id: UUID, limit: int = 100, offset: int = 0) -> list[dict]:
         """Get logs for a task from filesystem with pagination.
 
         Reads from session.jsonl file (JSONL format - one JSON object per line).
-        Streams line-by-line to avoid loading entire file into memory.
+        The file is memory-mapped and the offsets of its non-blank lines are
+        cached until its mtime or size changes, so a page costs O(limit)
+        parsing instead of a scan of the whole file. Use count_task_logs()
+        for the total.
 
         Args:
             task_id: UUID of the task
             limit: Maximum number of log lines to return
-            offset: Number of log lines to skip
+            offset: Number of log lines to skip (negative is treated as 0)
 
         Returns:
-            Tuple of (logs, total_count)
+            Parsed log lines on the requested page
         """
         # Verify task exists
         TaskService.get_task_by_id(task_id)
 
         # Read logs from session file (JSONL format)
-        log_file = Path("logs/tasks") / str(task_id) / "session.jsonl"
+        log_file = Path(settings.task_logs_dir) / str(task_id) / "session.jsonl"
         if not log_file.exists():
             logger.warning(f"No logs found for task {task_id}")
-            return [], 0
+            return []
 
         try:
             logs = []
-            total = 0
-            line_num = 0
+            with _map_log(log_file) as (mm, starts, ends):
+                offset = _clamp_offset(offset)
+                page = range(offset, min(offset + limit, len(starts)))
+                for line_num in page:
+                    line = mm[starts[line_num] : ends[line_num]].strip()
 
-            with open(log_file) as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
+                    # Parse and add to results (json.loads accepts UTF-8 bytes)
+                    try:
+                        logs.append(json.loads(line))
+                    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                        logger.warning(f"Failed to parse log line {line_num}: {e}")
+                        raw = line.decode(errors="replace")
+                        logs.append({"error": "Failed to parse", "raw": raw})
 
-                    total += 1
+            return logs
+        except (OSError, ValueError) as e:
+            # ValueError: the file was emptied between fstat() and mmap()
+            logger.error(f"Failed to read logs for task {task_id}: {e}")
+            return []
 
-                    # Skip lines before offset
-                    if line_num < offset:
-                        line_num += 1
-                        continue
+    @staticmethod
+    def count_task_logs(task_id: UUID) -> int:
+        """Count the non-blank lines in a task's session.jsonl.
 
-                    # Stop if we've collected enough
-                    if len(logs) >= limit:
-                        # Continue counting total but don't parse
-                        continue
+        Shares the cached line index with get_task_logs, so the file is only
+        rescanned after it changes.
 
-                    # Parse and add to results
-                    try:
-                        logs.append(json.loads(line))
-                    except json.JSONDecodeError as e:
-                        logger.warning(f"Failed to parse log line {line_num}: {e}")
-                        logs.append({"error": "Failed to parse", "raw": line})
+        Args:
+            task_id: UUID of the task
 
-                    line_num += 1
+        Returns:
+            Number of log lines, or 0 if there are none or they can't be read
+        """
+        log_file = Path(settings.task_logs_dir) / str(task_id) / "session.jsonl"
+        if not log_file.exists():
+            return 0
 
-            return logs, total
-        except Exception as e:
+        try:
+            with _map_log(log_file) as (_, starts, _):
+                return len(starts)
+        except (OSError, ValueError) as e:
             logger.error(f"Failed to read logs for task {task_id}: {e}")
-            return [], 0
+            return 0
 
     @staticmethod
     def get_task_files(task_id: UUID) -> list[TaskFile]:
@@ -198,7 +331,7 @@ class TaskService:
         if task.status != "completed":
             raise ValueError("Task must be completed to retrieve files")
 
-        files_dir = Path("logs/tasks") / str(task_id) / "files"
+        files_dir = Path(settings.task_logs_dir) / str(task_id) / "files"
         if not files_dir.exists():
             return []
 
@@ -232,7 +365,7 @@ class TaskService:
         """
         task = TaskService.get_task_by_id(task_id)
 
-        session_file = Path("logs/tasks") / str(task_id) / "session.jsonl"
+        session_file = Path(settings.task_logs_dir) / str(task_id) / "session.jsonl"
         if not session_file.exists():
             raise NotFoundError(f"Session file not found for task {task_id}")
 
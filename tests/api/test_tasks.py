@@ -1,15 +1,20 @@
 """Tests for task API endpoints."""
 
-from pathlib import Path
+import base64
+from unittest.mock import patch
 from uuid import uuid4
 
+import pytest
+
 from app.services import TaskService
-from tests.conftest import create_test_task
+from tests.conftest import create_test_task, create_test_tasks
+
+pytestmark = [pytest.mark.anyio, pytest.mark.usefixtures("clean_db")]
 
 
-def test_create_task(test_client, auth_headers):
+async def test_create_task(async_client, auth_headers):
     """Test POST /v1/tasks endpoint."""
-    response = test_client.post(
+    response = await async_client.post(
         "/v1/tasks",
         json={
             "prompt": "Test task via API",
@@ -30,11 +35,11 @@ def test_create_task(test_client, auth_headers):
     assert "updated_at" in data
 
 
-def test_get_task(test_client, auth_headers):
+async def test_get_task(async_client, auth_headers):
     """Test GET /v1/tasks/{task_id} endpoint."""
     task = create_test_task(prompt="Task to retrieve via API")
 
-    response = test_client.get(f"/v1/tasks/{task.id}", headers=auth_headers)
+    response = await async_client.get(f"/v1/tasks/{task.id}", headers=auth_headers)
 
     assert response.status_code == 200
     data = response.json()
@@ -43,18 +48,20 @@ def test_get_task(test_client, auth_headers):
     assert data["status"] == task.status
 
 
-def test_get_task_not_found(test_client, auth_headers):
+async def test_get_task_not_found(async_client, auth_headers):
     """Test GET /v1/tasks/{task_id} with non-existent ID."""
     non_existent_id = uuid4()
-    response = test_client.get(f"/v1/tasks/{non_existent_id}", headers=auth_headers)
+    response = await async_client.get(
+        f"/v1/tasks/{non_existent_id}", headers=auth_headers
+    )
 
     assert response.status_code == 404
     assert "not found" in response.json()["detail"]
 
 
-def test_list_tasks_empty(test_client, auth_headers):
+async def test_list_tasks_empty(async_client, auth_headers):
     """Test GET /v1/tasks with no tasks."""
-    response = test_client.get("/v1/tasks", headers=auth_headers)
+    response = await async_client.get("/v1/tasks", headers=auth_headers)
 
     assert response.status_code == 200
     data = response.json()
@@ -64,14 +71,14 @@ def test_list_tasks_empty(test_client, auth_headers):
     assert data["offset"] == 0
 
 
-def test_list_tasks(test_client, auth_headers):
+async def test_list_tasks(async_client, auth_headers):
     """Test GET /v1/tasks endpoint."""
     # Create multiple tasks
     task1 = create_test_task(prompt="Task 1")
     task2 = create_test_task(prompt="Task 2")
     task3 = create_test_task(prompt="Task 3")
 
-    response = test_client.get("/v1/tasks", headers=auth_headers)
+    response = await async_client.get("/v1/tasks", headers=auth_headers)
 
     assert response.status_code == 200
     data = response.json()
@@ -86,14 +93,15 @@ def test_list_tasks(test_client, auth_headers):
     assert data["tasks"][2]["id"] == str(task1.id)
 
 
-def test_list_tasks_with_pagination(test_client, auth_headers):
+async def test_list_tasks_with_pagination(async_client, auth_headers):
     """Test GET /v1/tasks with pagination."""
     # Create multiple tasks
-    for i in range(5):
-        create_test_task(prompt=f"Task {i}")
+    create_test_tasks([f"Task {i}" for i in range(5)])
 
     # Get first page
-    response = test_client.get("/v1/tasks?limit=2&offset=0", headers=auth_headers)
+    response = await async_client.get(
+        "/v1/tasks?limit=2&offset=0", headers=auth_headers
+    )
     assert response.status_code == 200
     data = response.json()
     assert len(data["tasks"]) == 2
@@ -102,7 +110,9 @@ def test_list_tasks_with_pagination(test_client, auth_headers):
     assert data["offset"] == 0
 
     # Get second page
-    response = test_client.get("/v1/tasks?limit=2&offset=2", headers=auth_headers)
+    response = await async_client.get(
+        "/v1/tasks?limit=2&offset=2", headers=auth_headers
+    )
     assert response.status_code == 200
     data = response.json()
     assert len(data["tasks"]) == 2
@@ -111,30 +121,95 @@ def test_list_tasks_with_pagination(test_client, auth_headers):
     assert data["offset"] == 2
 
 
-def test_health_check(test_client, auth_headers):
+async def test_list_tasks_with_cursor(async_client, auth_headers):
+    """Test GET /v1/tasks follows next_cursor to the following page."""
+    tasks = create_test_tasks([f"Task {i}" for i in range(3)])
+
+    response = await async_client.get(
+        "/v1/tasks", params={"limit": 2}, headers=auth_headers
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [t["id"] for t in data["tasks"]] == [str(tasks[2].id), str(tasks[1].id)]
+    # Opaque and safe to paste into a query string unencoded
+    assert data["next_cursor"] is not None
+    assert "+" not in data["next_cursor"]
+
+    response = await async_client.get(
+        "/v1/tasks",
+        params={"limit": 2, "cursor": data["next_cursor"]},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [t["id"] for t in data["tasks"]] == [str(tasks[0].id)]
+    assert data["total"] == 3
+    assert data["next_cursor"] is None
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        pytest.param("not-a-cursor", id="not_base64"),
+        pytest.param(
+            base64.urlsafe_b64encode(
+                f"2024-01-01T00:00:00,{uuid4()}".encode()
+            ).decode(),
+            id="naive_timestamp",
+        ),
+    ],
+)
+async def test_list_tasks_invalid_cursor(async_client, auth_headers, cursor):
+    """Test GET /v1/tasks rejects a malformed cursor."""
+    response = await async_client.get(
+        "/v1/tasks", params={"cursor": cursor}, headers=auth_headers
+    )
+
+    assert response.status_code == 400
+    assert "Invalid cursor" in response.json()["detail"]
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        pytest.param({"offset": -1}, id="negative_offset"),
+        pytest.param({"limit": 0}, id="zero_limit"),
+    ],
+)
+@pytest.mark.parametrize("path", ["/v1/tasks", "/v1/tasks/{task_id}/logs"])
+async def test_pagination_params_validated(async_client, auth_headers, path, params):
+    """Test out-of-range limit/offset are rejected instead of paging wrongly."""
+    url = path.format(task_id=uuid4())
+    response = await async_client.get(url, params=params, headers=auth_headers)
+
+    assert response.status_code == 422
+
+
+async def test_health_check(async_client, auth_headers):
     """Test GET /health endpoint."""
-    response = test_client.get("/health", headers=auth_headers)
+    response = await async_client.get("/health", headers=auth_headers)
 
     assert response.status_code == 200
     assert response.json() == {"status": "healthy"}
 
 
-def test_get_task_logs(test_client, auth_headers, mocker):
+# Mock filesystem logs
+MOCK_LOGS = [
+    {"type": "SystemMessage", "data": {"session_id": "test-123"}},
+    {"type": "AssistantMessage", "data": {"content": "Hello"}},
+    {"type": "ResultMessage", "data": {"result": "Done"}},
+]
+
+
+@patch.object(TaskService, "count_task_logs", return_value=3)
+@patch.object(TaskService, "get_task_logs", return_value=MOCK_LOGS)
+async def test_get_task_logs(
+    mock_get_task_logs, mock_count_task_logs, async_client, auth_headers
+):
     """Test GET /v1/tasks/{task_id}/logs endpoint."""
     task = create_test_task(prompt="Task with logs")
 
-    # Mock filesystem logs
-    mock_logs = [
-        {"type": "SystemMessage", "data": {"session_id": "test-123"}},
-        {"type": "AssistantMessage", "data": {"content": "Hello"}},
-        {"type": "ResultMessage", "data": {"result": "Done"}},
-    ]
-    mocker.patch(
-        "app.services.task.TaskService.get_task_logs",
-        return_value=(mock_logs, 3),
-    )
-
-    response = test_client.get(f"/v1/tasks/{task.id}/logs", headers=auth_headers)
+    response = await async_client.get(f"/v1/tasks/{task.id}/logs", headers=auth_headers)
 
     assert response.status_code == 200
     data = response.json()
@@ -148,10 +223,10 @@ def test_get_task_logs(test_client, auth_headers, mocker):
     assert "session_id" in data["logs"][0]["data"]
 
 
-def test_get_task_logs_not_found(test_client, auth_headers):
+async def test_get_task_logs_not_found(async_client, auth_headers):
     """Test GET /v1/tasks/{task_id}/logs with non-existent task."""
     non_existent_id = uuid4()
-    response = test_client.get(
+    response = await async_client.get(
         f"/v1/tasks/{non_existent_id}/logs", headers=auth_headers
     )
 
@@ -159,17 +234,15 @@ def test_get_task_logs_not_found(test_client, auth_headers):
     assert "not found" in response.json()["detail"]
 
 
-def test_get_task_logs_empty(test_client, auth_headers, mocker):
+@patch.object(TaskService, "count_task_logs", return_value=0)
+@patch.object(TaskService, "get_task_logs", return_value=[])
+async def test_get_task_logs_empty(
+    mock_get_task_logs, mock_count_task_logs, async_client, auth_headers
+):
     """Test GET /v1/tasks/{task_id}/logs with no logs."""
     task = create_test_task(prompt="Task without logs")
 
-    # Mock empty logs
-    mocker.patch(
-        "app.services.task.TaskService.get_task_logs",
-        return_value=([], 0),
-    )
-
-    response = test_client.get(f"/v1/tasks/{task.id}/logs", headers=auth_headers)
+    response = await async_client.get(f"/v1/tasks/{task.id}/logs", headers=auth_headers)
 
     assert response.status_code == 200
     data = response.json()
@@ -177,55 +250,56 @@ def test_get_task_logs_empty(test_client, auth_headers, mocker):
     assert len(data["logs"]) == 0
 
 
-def test_get_task_files(test_client, auth_headers, mocker):
+@pytest.mark.io
+async def test_get_task_files(async_client, auth_headers, task_logs_dir):
     """Test GET /v1/tasks/{task_id}/files."""
     task = create_test_task(prompt="Test task")
     TaskService.update_task_status(task.id, "completed")
 
     # Mock files directory
-    files_dir = Path("logs/tasks") / str(task.id) / "files"
+    files_dir = task_logs_dir / str(task.id) / "files"
     files_dir.mkdir(parents=True, exist_ok=True)
     (files_dir / "test.py").write_text("print('hello')")
     (files_dir / "subdir").mkdir()
     (files_dir / "subdir" / "test2.py").write_text("print('world')")
 
-    try:
-        response = test_client.get(f"/v1/tasks/{task.id}/files", headers=auth_headers)
-
-        assert response.status_code == 200
-        data = response.json()
-        assert data["task_id"] == str(task.id)
-        assert data["total"] == 2
-        assert len(data["files"]) == 2
+    response = await async_client.get(
+        f"/v1/tasks/{task.id}/files", headers=auth_headers
+    )
 
-        # Check file contents
-        file_paths = {f["path"] for f in data["files"]}
-        assert "test.py" in file_paths
-        assert "subdir/test2.py" in file_paths or "subdir\\test2.py" in file_paths
-    finally:
-        # Cleanup
-        import shutil
+    assert response.status_code == 200
+    data = response.json()
+    assert data["task_id"] == str(task.id)
+    assert data["total"] == 2
+    assert len(data["files"]) == 2
 
-        shutil.rmtree(files_dir.parent, ignore_errors=True)
+    # Check file contents
+    file_paths = {f["path"] for f in data["files"]}
+    assert "test.py" in file_paths
+    assert "subdir/test2.py" in file_paths or "subdir\\test2.py" in file_paths
 
 
-def test_get_task_files_not_completed(test_client, auth_headers):
+async def test_get_task_files_not_completed(async_client, auth_headers):
     """Test GET /v1/tasks/{task_id}/files with non-completed task."""
     task = create_test_task(prompt="Running task")
     TaskService.update_task_status(task.id, "running")
 
-    response = test_client.get(f"/v1/tasks/{task.id}/files", headers=auth_headers)
+    response = await async_client.get(
+        f"/v1/tasks/{task.id}/files", headers=auth_headers
+    )
 
     assert response.status_code == 400
     assert "must be completed" in response.json()["detail"]
 
 
-def test_get_task_files_no_files(test_client, auth_headers):
+async def test_get_task_files_no_files(async_client, auth_headers):
     """Test GET /v1/tasks/{task_id}/files with no files."""
     task = create_test_task(prompt="Test task")
     TaskService.update_task_status(task.id, "completed")
 
-    response = test_client.get(f"/v1/tasks/{task.id}/files", headers=auth_headers)
+    response = await async_client.get(
+        f"/v1/tasks/{task.id}/files", headers=auth_headers
+    )
 
     assert response.status_code == 200
     data = response.json()
@@ -233,39 +307,38 @@ def test_get_task_files_no_files(test_client, auth_headers):
     assert len(data["files"]) == 0
 
 
-def test_get_task_session(test_client, auth_headers):
+@pytest.mark.io
+async def test_get_task_session(async_client, auth_headers, task_logs_dir):
     """Test GET /v1/tasks/{task_id}/session."""
     task = create_test_task(prompt="Test task")
     TaskService.update_task_status(task.id, "completed", session_id="test-session-123")
 
     # Mock session file
-    session_dir = Path("logs/tasks") / str(task.id)
+    session_dir = task_logs_dir / str(task.id)
     session_dir.mkdir(parents=True, exist_ok=True)
     session_file = session_dir / "session.jsonl"
     session_content = '{"test": "data"}\n'
     session_file.write_text(session_content)
 
-    try:
-        response = test_client.get(f"/v1/tasks/{task.id}/session", headers=auth_headers)
-
-        assert response.status_code == 200
-        data = response.json()
-        assert data["task_id"] == str(task.id)
-        assert data["session_id"] == "test-session-123"
-        assert data["session_data"] == session_content
-    finally:
-        # Cleanup
-        import shutil
+    response = await async_client.get(
+        f"/v1/tasks/{task.id}/session", headers=auth_headers
+    )
 
-        shutil.rmtree(session_dir, ignore_errors=True)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["task_id"] == str(task.id)
+    assert data["session_id"] == "test-session-123"
+    assert data["session_data"] == session_content
 
 
-def test_get_task_session_not_found(test_client, auth_headers):
+async def test_get_task_session_not_found(async_client, auth_headers):
     """Test GET /v1/tasks/{task_id}/session with missing session file."""
     task = create_test_task(prompt="Test task")
     TaskService.update_task_status(task.id, "completed")
 
-    response = test_client.get(f"/v1/tasks/{task.id}/session", headers=auth_headers)
+    response = await async_client.get(
+        f"/v1/tasks/{task.id}/session", headers=auth_headers
+    )
 
     assert response.status_code == 404
     assert "not found" in response.json()["detail"]
@@ -1,57 +1,247 @@
 """Pytest configuration and fixtures."""
 
 import os
+from dataclasses import dataclass
+from types import MappingProxyType, SimpleNamespace
+from typing import TYPE_CHECKING
+from unittest.mock import Mock, patch
 
+import httpx
 import pytest
-from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, make_url, text
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
 from sqlmodel import SQLModel
 
-from app.core.database import clean_database, close_db, get_engine
-from app.main import app
-from app.models import Task
-from app.services import TaskService
+if TYPE_CHECKING:
+    from app.models import Task
 
-# Set test environment
-os.environ["APP_ENV"] = "test"
+
+# Shared SandboxService.run_command results; never mutate these in a test
+SUCCESS_RESULT = SimpleNamespace(exit_code=0, stdout="", stderr="")
+FAILURE_RESULT = SimpleNamespace(exit_code=1, stdout="", stderr="command failed")
+
+# Read-only SandboxService.run_agent output; use {**AGENT_OUTPUT, ...} for variants
+AGENT_OUTPUT = MappingProxyType(
+    {
+        "session_id": "test-session-123",
+        "result": "Task completed successfully",
+        "cost": 0.01,
+        "duration_ms": 1000,
+        "num_turns": 2,
+        "timed_out": False,
+        "logs": (),
+    }
+)
+
+
+@dataclass
+class SandboxMocks:
+    """Patched sandbox entry points for a successful task run."""
+
+    sandbox: Mock
+    create_sandbox: Mock
+    setup: Mock
+    run_command: Mock
+    run_agent: Mock
+
+
+def pytest_configure(config):
+    """Set the test environment before any app module reads its settings."""
+    os.environ["APP_ENV"] = "test"
 
 
 def create_test_task(
     prompt: str = "Test task prompt",
     repository_url: str = "https://github.com/test/repo.git",
     parent_task_id=None,
-) -> Task:
+) -> "Task":
     """Helper function to create a test task with default values."""
+    from app.services import TaskService
+
     return TaskService.create_task(
         prompt=prompt, repository_url=repository_url, parent_task_id=parent_task_id
     )
 
 
-@pytest.fixture(autouse=True, scope="function")
-def mock_celery_task(mocker):
-    """Mock Celery task execution for all tests."""
-    mocker.patch("app.tasks.agent_execution.execute_agent_task.delay")
+def create_test_tasks(
+    prompts: list[str],
+    repository_url: str = "https://github.com/test/repo.git",
+) -> list["Task"]:
+    """Insert one task per prompt in a single commit, oldest first.
+
+    Unlike create_test_task this skips TaskService and the Celery queue.
+    """
+    from app.core.database import get_session
+    from app.models import Task
+    from app.services import task as task_service
+
+    tasks = [Task(prompt=prompt, repository_url=repository_url) for prompt in prompts]
+    with get_session() as session:
+        session.add_all(tasks)
+    task_service._invalidate_task_count()
+
+    return tasks
+
 
+@pytest.fixture(scope="session")
+def worker_database():
+    """Give each pytest-xdist worker its own database.
+
+    Each session truncates tables on startup, so sharing one database would
+    let workers wipe each other's rows. Outside of xdist this is a no-op.
+    """
+    from app.core.config import settings
+
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    if worker is None:
+        return
+
+    url = make_url(settings.database_url)
+    worker_url = url.set(database=f"{url.database}_{worker}")
+
+    admin_engine = create_engine(url, isolation_level="AUTOCOMMIT", poolclass=NullPool)
+    with admin_engine.connect() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM pg_database WHERE datname = :name"),
+            {"name": worker_url.database},
+        ).scalar()
+        if not exists:
+            conn.execute(text(f'CREATE DATABASE "{worker_url.database}"'))
+    admin_engine.dispose()
+
+    settings.database_url = worker_url.render_as_string(hide_password=False)
+
+
+@pytest.fixture(autouse=True, scope="session")
+def mock_celery_task():
+    """Mock Celery task execution once for the whole test session."""
+    from app.tasks import execute_agent_task
+
+    with patch.object(execute_agent_task, "delay") as mock_delay:
+        yield mock_delay
+
+
+@pytest.fixture(scope="session")
+def db_engine(worker_database):
+    """Create the database engine and schema once per test session.
+
+    The engine is pooled, so each test's connection is checked out from the
+    pool instead of opening a new one to the database.
+    """
+    from app.core.database import clean_database, close_db, get_engine
 
-@pytest.fixture(autouse=True, scope="function")
-def clean_db():
-    """Initialize and clean database for each test."""
-    # Create tables
     engine = get_engine()
     SQLModel.metadata.create_all(engine)
 
-    # Clean all tables before test to ensure isolation
+    # Clear rows left behind by runs that predate per-test rollback
     clean_database()
 
-    yield
+    yield engine
 
-    # Close DB connections
     close_db()
 
 
 @pytest.fixture(scope="function")
-def test_client():
-    """Create a test client."""
-    with TestClient(app) as client:
+def clean_db(db_engine, monkeypatch):
+    """Run each test inside a transaction that is rolled back afterwards.
+
+    Every get_session() call gets a new Session bound to the test's
+    connection, so commits only release a SAVEPOINT and nothing persists.
+    """
+    from app.core import database
+    from app.services import task as task_service
+
+    connection = db_engine.connect()
+    transaction = connection.begin()
+    monkeypatch.setattr(
+        database,
+        "_session_maker",
+        sessionmaker(
+            bind=connection,
+            class_=Session,
+            expire_on_commit=False,
+            autoflush=False,
+            join_transaction_mode="create_savepoint",
+        ),
+    )
+    # A count cached by an earlier test would include its rolled-back rows
+    monkeypatch.setattr(task_service, "_task_count", None)
+
+    yield
+
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture(scope="function")
+def task(clean_db) -> "Task":
+    """Provide a default test task for tests that don't care about its fields."""
+    return create_test_task()
+
+
+@pytest.fixture(scope="function")
+def task_logs_dir(tmp_path, monkeypatch):
+    """Point task log and file storage at a per-test temporary directory."""
+    from app.core.config import settings
+
+    logs_dir = tmp_path / "tasks"
+    monkeypatch.setattr(settings, "task_logs_dir", str(logs_dir))
+    return logs_dir
+
+
+@pytest.fixture(scope="function")
+def sandbox_mocks():
+    """Patch the sandbox so a task runs to completion without changes.
+
+    Tests override only the mock they care about, e.g.
+    ``sandbox_mocks.run_command.side_effect = ...``.
+    """
+    from app.services import AgentExecutionService
+    from app.services.sandbox import SandboxService
+
+    sandbox = Mock()
+    sandbox.sandbox_id = "test-sandbox-123"
+
+    mocks = SandboxMocks(
+        sandbox=sandbox,
+        create_sandbox=Mock(return_value=sandbox),
+        setup=Mock(),
+        run_command=Mock(return_value=SUCCESS_RESULT),
+        run_agent=Mock(return_value=AGENT_OUTPUT),
+    )
+
+    with (
+        patch.multiple(
+            SandboxService,
+            create_sandbox=mocks.create_sandbox,
+            run_command=mocks.run_command,
+            run_agent=mocks.run_agent,
+        ),
+        patch.object(AgentExecutionService, "setup_sandbox_environment", mocks.setup),
+    ):
+        yield mocks
+
+
+@pytest.fixture(scope="session")
+def app_instance():
+    """Import the FastAPI app only for tests that make HTTP requests."""
+    from app.main import app
+
+    return app
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    """Run async tests on asyncio only."""
+    return "asyncio"
+
+
+@pytest.fixture(scope="function")
+async def async_client(app_instance):
+    """Create an async test client that calls the ASGI app in-process."""
+    transport = httpx.ASGITransport(app=app_instance)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
         yield client
 
 
@@ -1,11 +1,17 @@
 """Tests for ApiClientService."""
 
-import os
+import asyncio
+import json
+import random
+import time
+from types import MappingProxyType
+from unittest.mock import Mock, patch
 from uuid import UUID
 
 import httpx
 import pytest
 
+from app.api.tasks import TaskResponse
 from app.services.api_client import ApiClientService
 
 # Test UUIDs
@@ -13,57 +19,9 @@ TEST_UUID_1 = UUID("12345678-1234-5678-1234-567812345678")
 TEST_UUID_2 = UUID("12345678-1234-5678-1234-567812345679")
 TEST_UUID_3 = UUID("12345678-1234-5678-1234-567812345680")
 
-
-def test_get_client_default_values(mocker):
-    """Test get_client with default values from environment."""
-    mocker.patch.dict(
-        os.environ,
-        {"CLOUD_AGENT_URL": "http://test.example.com", "API_SECRET_KEY": "test-key"},
-    )
-
-    client = ApiClientService.get_client()
-
-    assert isinstance(client, httpx.Client)
-    assert str(client.base_url) == "http://test.example.com"
-    assert client.headers["X-API-Key"] == "test-key"
-    assert client.timeout.read == 30.0
-    client.close()
-
-
-def test_get_client_with_explicit_values():
-    """Test get_client with explicitly provided values."""
-    client = ApiClientService.get_client(
-        base_url="http://custom.example.com", api_key="custom-key"
-    )
-
-    assert isinstance(client, httpx.Client)
-    assert str(client.base_url) == "http://custom.example.com"
-    assert client.headers["X-API-Key"] == "custom-key"
-    assert client.timeout.read == 30.0
-    client.close()
-
-
-def test_get_client_fallback_defaults(mocker):
-    """Test get_client falls back to defaults when env vars not set."""
-    # Set environment to have empty API key (httpx doesn't allow None in headers)
-    mocker.patch.dict(
-        os.environ, {"CLOUD_AGENT_URL": "http://localhost:8000", "API_SECRET_KEY": ""}
-    )
-
-    client = ApiClientService.get_client()
-
-    assert isinstance(client, httpx.Client)
-    assert str(client.base_url) == "http://localhost:8000"
-    assert client.headers["X-API-Key"] == ""
-    client.close()
-
-
-def test_create_task_success(mocker):
-    """Test creating a task successfully."""
-    # Mock httpx.Client
-    mock_response = mocker.Mock()
-    mock_response.json.return_value = {
-        "id": str(TEST_UUID_1),
+# Task API response fields shared by every test; see task_json()
+BASE_TASK_JSON = MappingProxyType(
+    {
         "prompt": "Test prompt",
         "repository_url": "https://github.com/test/repo.git",
         "status": "pending",
@@ -74,419 +32,321 @@ def test_create_task_success(mocker):
         "created_at": "2025-01-01T00:00:00Z",
         "updated_at": "2025-01-01T00:00:00Z",
     }
+)
 
-    mock_client = mocker.Mock(spec=httpx.Client)
-    mock_client.post.return_value = mock_response
-    mock_client.__enter__ = mocker.Mock(return_value=mock_client)
-    mock_client.__exit__ = mocker.Mock(return_value=False)
 
-    mocker.patch.object(ApiClientService, "get_client", return_value=mock_client)
+@pytest.fixture(autouse=True)
+def shared_client():
+    """Drop the shared client after each test so tests can't leak it."""
+    yield
+    ApiClientService.close()
 
-    task = ApiClientService.create_task(
-        prompt="Test prompt", repository_url="https://github.com/test/repo.git"
-    )
 
-    assert task.id == TEST_UUID_1
-    assert task.prompt == "Test prompt"
-    assert task.status == "pending"
-    mock_client.post.assert_called_once_with(
-        "/v1/tasks",
-        json={
-            "prompt": "Test prompt",
-            "repository_url": "https://github.com/test/repo.git",
-        },
-    )
-    mock_response.raise_for_status.assert_called_once()
+@pytest.fixture(autouse=True)
+def no_jitter(monkeypatch):
+    """Disable polling jitter so wait_for_task sleeps are deterministic."""
+    monkeypatch.setattr(random, "uniform", lambda a, b: 1.0)
 
 
-def test_create_task_with_parent_task_id(mocker):
-    """Test creating a task with parent_task_id."""
-    mock_response = mocker.Mock()
-    mock_response.json.return_value = {
-        "id": str(TEST_UUID_2),
-        "prompt": "Resume task",
-        "repository_url": "https://github.com/test/repo.git",
-        "status": "pending",
-        "parent_task_id": str(TEST_UUID_1),
-        "result": None,
-        "sandbox_id": None,
-        "session_id": None,
-        "created_at": "2025-01-01T00:00:00Z",
-        "updated_at": "2025-01-01T00:00:00Z",
-    }
+@pytest.fixture(autouse=True)
+def mock_sleep(monkeypatch):
+    """Replace time.sleep so no test in this module waits on the real clock."""
+    sleep = Mock()
+    monkeypatch.setattr(time, "sleep", sleep)
+    return sleep
 
-    mock_client = mocker.Mock(spec=httpx.Client)
-    mock_client.post.return_value = mock_response
-    mock_client.__enter__ = mocker.Mock(return_value=mock_client)
-    mock_client.__exit__ = mocker.Mock(return_value=False)
 
-    mocker.patch.object(ApiClientService, "get_client", return_value=mock_client)
+@pytest.fixture(autouse=True)
+def frozen_clock(monkeypatch):
+    """Freeze the monotonic clock so request latency never shortens sleeps.
 
-    task = ApiClientService.create_task(
-        prompt="Resume task",
-        repository_url="https://github.com/test/repo.git",
-        parent_task_id=str(TEST_UUID_1),
-    )
+    Timeout tests patch time.monotonic again with their own sequence.
+    """
+    monkeypatch.setattr(time, "monotonic", lambda: 0.0)
 
-    assert str(task.id) == str(TEST_UUID_2)
-    assert str(task.parent_task_id) == str(TEST_UUID_1)
-    mock_client.post.assert_called_once_with(
-        "/v1/tasks",
-        json={
-            "prompt": "Resume task",
-            "repository_url": "https://github.com/test/repo.git",
-            "parent_task_id": str(TEST_UUID_1),
-        },
-    )
 
+@pytest.fixture
+def api_env(monkeypatch):
+    """Set the API client environment variables; None unsets a variable.
 
-def test_create_task_with_provided_client(mocker):
-    """Test creating a task with a provided client (should not close it)."""
-    mock_response = mocker.Mock()
-    mock_response.json.return_value = {
-        "id": str(TEST_UUID_3),
-        "prompt": "Test",
-        "repository_url": "https://github.com/test/repo.git",
-        "status": "pending",
-        "result": None,
-        "sandbox_id": None,
-        "session_id": None,
-        "parent_task_id": None,
-        "created_at": "2025-01-01T00:00:00Z",
-        "updated_at": "2025-01-01T00:00:00Z",
-    }
+    Clears the cached get_client defaults so the new values are picked up.
+    """
 
-    mock_client = mocker.Mock(spec=httpx.Client)
-    mock_client.post.return_value = mock_response
+    def set_env(url: str | None = None, key: str | None = None) -> None:
+        for name, value in (("CLOUD_AGENT_URL", url), ("API_SECRET_KEY", key)):
+            if value is None:
+                monkeypatch.delenv(name, raising=False)
+            else:
+                monkeypatch.setenv(name, value)
+        ApiClientService._resolve_defaults.cache_clear()
 
-    task = ApiClientService.create_task(
-        prompt="Test",
-        repository_url="https://github.com/test/repo.git",
-        client=mock_client,
-    )
+    yield set_env
 
-    assert str(task.id) == str(TEST_UUID_3)
-    # Client.close() should NOT be called when client is provided
-    mock_client.close.assert_not_called()
+    ApiClientService._resolve_defaults.cache_clear()
 
 
-def test_create_task_http_error(mocker):
-    """Test creating a task with HTTP error."""
-    mock_response = mocker.Mock()
-    mock_response.raise_for_status.side_effect = httpx.HTTPStatusError(
-        "Not Found", request=mocker.Mock(), response=mocker.Mock(status_code=404)
+@pytest.mark.parametrize(
+    ("env", "kwargs", "expected_url", "expected_key"),
+    [
+        pytest.param(
+            {"url": "http://test.example.com", "key": "test-key"},
+            {},
+            "http://test.example.com",
+            "test-key",
+            id="env_values",
+        ),
+        pytest.param(
+            {"url": "http://test.example.com", "key": "test-key"},
+            {"base_url": "http://custom.example.com", "api_key": "custom-key"},
+            "http://custom.example.com",
+            "custom-key",
+            id="explicit_values",
+        ),
+        pytest.param(
+            {},
+            {},
+            "http://localhost:8000",
+            "",
+            id="fallback_defaults",
+        ),
+    ],
+)
+def test_get_client(api_env, env, kwargs, expected_url, expected_key):
+    """Test get_client configuration from environment or explicit values."""
+    api_env(**env)
+
+    with ApiClientService.get_client(**kwargs) as client:
+        assert isinstance(client, httpx.Client)
+        assert str(client.base_url) == expected_url
+        assert client.headers["X-API-Key"] == expected_key
+        assert client.timeout.read == 30.0
+
+
+def test_get_shared_client(mocker):
+    """Test get_shared_client reuses one client until close() is called."""
+    client, _ = make_client()
+    mock_get_client = mocker.patch.object(
+        ApiClientService, "get_client", return_value=client
     )
 
-    mock_client = mocker.Mock(spec=httpx.Client)
-    mock_client.post.return_value = mock_response
-    mock_client.__enter__ = mocker.Mock(return_value=mock_client)
-    mock_client.__exit__ = mocker.Mock(return_value=False)
+    assert ApiClientService.get_shared_client() is client
+    assert ApiClientService.get_shared_client() is client
+    mock_get_client.assert_called_once()
 
-    mocker.patch.object(ApiClientService, "get_client", return_value=mock_client)
+    ApiClientService.close()
 
-    with pytest.raises(httpx.HTTPStatusError):
-        ApiClientService.create_task(
-            prompt="Test", repository_url="https://github.com/test/repo.git"
-        )
+    assert client.is_closed
+    assert ApiClientService._shared_client is None
 
 
-def test_get_task_success(mocker):
-    """Test getting a task successfully."""
-    mock_response = mocker.Mock()
-    mock_response.json.return_value = {
-        "id": str(TEST_UUID_1),
-        "prompt": "Test task",
-        "repository_url": "https://github.com/test/repo.git",
-        "status": "completed",
-        "result": None,
-        "sandbox_id": None,
-        "session_id": None,
-        "parent_task_id": None,
-        "created_at": "2025-01-01T00:00:00Z",
-        "updated_at": "2025-01-01T00:05:00Z",
-    }
+def test_get_shared_client_after_close(mocker):
+    """Test close() resets the singleton so the next call builds a new client."""
+    first, _ = make_client()
+    second, _ = make_client()
+    mocker.patch.object(ApiClientService, "get_client", side_effect=[first, second])
 
-    mock_client = mocker.Mock(spec=httpx.Client)
-    mock_client.get.return_value = mock_response
-    mock_client.__enter__ = mocker.Mock(return_value=mock_client)
-    mock_client.__exit__ = mocker.Mock(return_value=False)
+    assert ApiClientService.get_shared_client() is first
+    ApiClientService.close()
 
-    mocker.patch.object(ApiClientService, "get_client", return_value=mock_client)
+    assert ApiClientService.get_shared_client() is second
+    assert first.is_closed
+    assert not second.is_closed
 
-    task = ApiClientService.get_task(str(TEST_UUID_1))
 
-    assert str(task.id) == str(TEST_UUID_1)
-    assert task.status == "completed"
-    mock_client.get.assert_called_once_with(f"/v1/tasks/{TEST_UUID_1}")
-    mock_response.raise_for_status.assert_called_once()
+def make_client(
+    status_code: int = 200, body: dict | None = None
+) -> tuple[httpx.Client, list[httpx.Request]]:
+    """Build a real httpx.Client whose transport returns a canned response.
 
+    Returns the client and the list of requests it has sent.
+    """
+    requests = []
 
-def test_get_task_with_provided_client(mocker):
-    """Test getting a task with a provided client (should not close it)."""
-    mock_response = mocker.Mock()
-    mock_response.json.return_value = {
-        "id": str(TEST_UUID_2),
-        "prompt": "Test",
-        "repository_url": "https://github.com/test/repo.git",
-        "status": "pending",
-        "result": None,
-        "sandbox_id": None,
-        "session_id": None,
-        "parent_task_id": None,
-        "created_at": "2025-01-01T00:00:00Z",
-        "updated_at": "2025-01-01T00:00:00Z",
-    }
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(status_code, json=body)
+
+    client = httpx.Client(
+        transport=httpx.MockTransport(handler), base_url="http://test"
+    )
+    return client, requests
 
-    mock_client = mocker.Mock(spec=httpx.Client)
-    mock_client.get.return_value = mock_response
 
-    task = ApiClientService.get_task(str(TEST_UUID_2), client=mock_client)
+def task_json(task_id: UUID, **overrides) -> dict:
+    """Build a task API response body with default field values."""
+    return {**BASE_TASK_JSON, "id": str(task_id), **overrides}
 
-    assert str(task.id) == str(TEST_UUID_2)
-    # Client.close() should NOT be called when client is provided
-    mock_client.close.assert_not_called()
 
+def task_response(task_id: UUID = TEST_UUID_1, **overrides) -> TaskResponse:
+    """Build a TaskResponse as returned by get_task, for wait_for_task tests."""
+    return TaskResponse(**task_json(task_id, **overrides))
 
-def test_get_task_not_found(mocker):
-    """Test getting a non-existent task."""
-    mock_response = mocker.Mock()
-    mock_response.raise_for_status.side_effect = httpx.HTTPStatusError(
-        "Not Found", request=mocker.Mock(), response=mocker.Mock(status_code=404)
-    )
 
-    mock_client = mocker.Mock(spec=httpx.Client)
-    mock_client.get.return_value = mock_response
-    mock_client.__enter__ = mocker.Mock(return_value=mock_client)
-    mock_client.__exit__ = mocker.Mock(return_value=False)
+@pytest.fixture
+def stub_api():
+    """Install a canned-response client as the shared API client.
 
-    mocker.patch.object(ApiClientService, "get_client", return_value=mock_client)
+    Returns a make_client-style factory; the autouse shared_client fixture
+    closes the client afterwards.
+    """
 
-    with pytest.raises(httpx.HTTPStatusError):
-        ApiClientService.get_task("non-existent-id")
+    def install(
+        status_code: int = 200, body: dict | None = None
+    ) -> tuple[httpx.Client, list[httpx.Request]]:
+        client, requests = make_client(status_code, body)
+        ApiClientService._shared_client = client
+        return client, requests
 
+    return install
 
-def test_wait_for_task_completed_immediately(mocker):
-    """Test wait_for_task when task is already completed."""
-    from app.api.tasks import TaskResponse
 
-    mock_get_task = mocker.patch.object(ApiClientService, "get_task")
-    mock_get_task.return_value = TaskResponse(
-        id=str(TEST_UUID_1),
-        status="completed",
-        prompt="Test task",
-        result="Task completed successfully",
+@pytest.mark.parametrize(
+    ("parent_task_id", "provide_client"),
+    [
+        pytest.param(None, False, id="default"),
+        pytest.param(str(TEST_UUID_1), False, id="with_parent_task_id"),
+        pytest.param(None, True, id="with_provided_client"),
+    ],
+)
+def test_create_task(mocker, parent_task_id, provide_client):
+    """Test creating a task, optionally resuming a parent or reusing a client."""
+    client, requests = make_client(
+        body=task_json(TEST_UUID_2, parent_task_id=parent_task_id)
+    )
+    mock_get_client = mocker.patch.object(
+        ApiClientService, "get_client", return_value=client
+    )
+
+    task = ApiClientService.create_task(
+        prompt="Test prompt",
         repository_url="https://github.com/test/repo.git",
-        sandbox_id=None,
-        session_id=None,
-        parent_task_id=None,
-        created_at="2025-01-01T00:00:00Z",
-        updated_at="2025-01-01T00:00:00Z",
+        parent_task_id=parent_task_id,
+        client=client if provide_client else None,
     )
 
-    result = ApiClientService.wait_for_task(str(TEST_UUID_1))
+    assert task.id == TEST_UUID_2
+    assert task.prompt == "Test prompt"
+    assert task.status == "pending"
+    if parent_task_id is None:
+        assert task.parent_task_id is None
+    else:
+        assert str(task.parent_task_id) == parent_task_id
 
-    assert str(result.id) == str(TEST_UUID_1)
-    assert result.status == "completed"
-    mock_get_task.assert_called_once_with(str(TEST_UUID_1))
+    expected_payload = {
+        "prompt": "Test prompt",
+        "repository_url": "https://github.com/test/repo.git",
+    }
+    if parent_task_id is not None:
+        expected_payload["parent_task_id"] = parent_task_id
+    assert len(requests) == 1
+    assert requests[0].method == "POST"
+    assert requests[0].url.path == "/v1/tasks"
+    assert json.loads(requests[0].content) == expected_payload
+
+    # The shared client is only created when none is provided, and the
+    # service never closes either one
+    assert mock_get_client.called is not provide_client
+    assert not client.is_closed
+    client.close()
 
 
-def test_wait_for_task_failed_immediately(mocker):
-    """Test wait_for_task when task has already failed."""
-    from app.api.tasks import TaskResponse
+def test_create_task_http_error(stub_api):
+    """Test creating a task with HTTP error."""
+    stub_api(status_code=404, body={"detail": "Not Found"})
 
-    mock_get_task = mocker.patch.object(ApiClientService, "get_task")
-    mock_get_task.return_value = TaskResponse(
-        id=str(TEST_UUID_2),
-        status="failed",
-        prompt="Test task",
-        result="Task failed with error",
-        repository_url="https://github.com/test/repo.git",
-        sandbox_id=None,
-        session_id=None,
-        parent_task_id=None,
-        created_at="2025-01-01T00:00:00Z",
-        updated_at="2025-01-01T00:00:00Z",
-    )
+    with pytest.raises(httpx.HTTPStatusError):
+        ApiClientService.create_task(
+            prompt="Test", repository_url="https://github.com/test/repo.git"
+        )
 
-    result = ApiClientService.wait_for_task(str(TEST_UUID_2))
 
-    assert str(result.id) == str(TEST_UUID_2)
-    assert result.status == "failed"
-    mock_get_task.assert_called_once_with(str(TEST_UUID_2))
+def test_get_task_success(stub_api):
+    """Test getting a task successfully."""
+    client, requests = stub_api(body=task_json(TEST_UUID_1, status="completed"))
 
+    task = ApiClientService.get_task(str(TEST_UUID_1))
 
-def test_wait_for_task_cancelled_immediately(mocker):
-    """Test wait_for_task when task is cancelled."""
-    from app.api.tasks import TaskResponse
+    assert str(task.id) == str(TEST_UUID_1)
+    assert task.status == "completed"
+    assert len(requests) == 1
+    assert requests[0].method == "GET"
+    assert requests[0].url.path == f"/v1/tasks/{TEST_UUID_1}"
+    # The shared client stays open for the next call
+    assert not client.is_closed
 
-    mock_get_task = mocker.patch.object(ApiClientService, "get_task")
-    mock_get_task.return_value = TaskResponse(
-        id=str(TEST_UUID_3),
-        status="cancelled",
-        prompt="Test task",
-        repository_url="https://github.com/test/repo.git",
-        result=None,
-        sandbox_id=None,
-        session_id=None,
-        parent_task_id=None,
-        created_at="2025-01-01T00:00:00Z",
-        updated_at="2025-01-01T00:00:00Z",
-    )
 
-    result = ApiClientService.wait_for_task(str(TEST_UUID_3))
+def test_get_task_with_provided_client():
+    """Test getting a task with a provided client (should not close it)."""
+    client, _ = make_client(body=task_json(TEST_UUID_2))
 
-    assert str(result.id) == str(TEST_UUID_3)
-    assert result.status == "cancelled"
-    mock_get_task.assert_called_once_with(str(TEST_UUID_3))
+    task = ApiClientService.get_task(str(TEST_UUID_2), client=client)
 
+    assert str(task.id) == str(TEST_UUID_2)
+    # Client should NOT be closed when it is provided
+    assert not client.is_closed
+    client.close()
 
-def test_wait_for_task_polling_until_completed(mocker):
-    """Test wait_for_task polls until task completes."""
-    from app.api.tasks import TaskResponse
 
-    mock_get_task = mocker.patch.object(ApiClientService, "get_task")
-    mock_sleep = mocker.patch("time.sleep")
+def test_get_task_not_found(stub_api):
+    """Test getting a non-existent task."""
+    stub_api(status_code=404, body={"detail": "Not Found"})
 
-    # Simulate task progression: pending -> running -> completed
-    mock_get_task.side_effect = [
-        TaskResponse(
-            id=str(TEST_UUID_1),
-            status="pending",
-            prompt="Test task",
-            repository_url="https://github.com/test/repo.git",
-            result=None,
-            sandbox_id=None,
-            session_id=None,
-            parent_task_id=None,
-            created_at="2025-01-01T00:00:00Z",
-            updated_at="2025-01-01T00:00:00Z",
-        ),
-        TaskResponse(
-            id=str(TEST_UUID_1),
-            status="running",
-            prompt="Test task",
-            repository_url="https://github.com/test/repo.git",
-            result=None,
-            sandbox_id=None,
-            session_id=None,
-            parent_task_id=None,
-            created_at="2025-01-01T00:00:00Z",
-            updated_at="2025-01-01T00:00:00Z",
-        ),
-        TaskResponse(
-            id=str(TEST_UUID_1),
-            status="completed",
-            prompt="Test task",
-            repository_url="https://github.com/test/repo.git",
-            result="Success",
-            sandbox_id=None,
-            session_id=None,
-            parent_task_id=None,
-            created_at="2025-01-01T00:00:00Z",
-            updated_at="2025-01-01T00:00:00Z",
-        ),
-    ]
+    with pytest.raises(httpx.HTTPStatusError):
+        ApiClientService.get_task("non-existent-id")
 
-    result = ApiClientService.wait_for_task(str(TEST_UUID_1), poll_interval=5)
 
-    assert str(result.id) == str(TEST_UUID_1)
-    assert result.status == "completed"
-    assert result.result == "Success"
-    assert mock_get_task.call_count == 3
-    # Should sleep twice (after first two polls)
-    assert mock_sleep.call_count == 2
-    mock_sleep.assert_called_with(5)
+@pytest.mark.parametrize("status", ["completed", "failed", "cancelled"])
+@patch.object(ApiClientService, "get_task")
+def test_wait_for_task_terminal_immediately(mock_get_task, status):
+    """Test wait_for_task returns after one check if the task already finished."""
+    mock_get_task.return_value = task_response(status=status)
 
+    result = ApiClientService.wait_for_task(str(TEST_UUID_1))
 
-def test_wait_for_task_polling_until_failed(mocker):
-    """Test wait_for_task polls until task fails."""
-    from app.api.tasks import TaskResponse
+    assert str(result.id) == str(TEST_UUID_1)
+    assert result.status == status
+    mock_get_task.assert_called_once_with(str(TEST_UUID_1))
 
-    mock_get_task = mocker.patch.object(ApiClientService, "get_task")
-    mock_sleep = mocker.patch("time.sleep")
 
-    # Simulate task progression: pending -> running -> failed
+@pytest.mark.parametrize(
+    ("final_status", "poll_interval", "expected_delays"),
+    [
+        pytest.param("completed", 5, [5, 7.5], id="completed"),
+        pytest.param("failed", 3, [3, 4.5], id="failed"),
+    ],
+)
+@patch.object(ApiClientService, "get_task")
+def test_wait_for_task_polling(
+    mock_get_task, mock_sleep, final_status, poll_interval, expected_delays
+):
+    """Test wait_for_task polls until the task finishes."""
+
+    # Simulate task progression: pending -> running -> final_status
     mock_get_task.side_effect = [
-        TaskResponse(
-            id=str(TEST_UUID_2),
-            status="pending",
-            prompt="Test task",
-            repository_url="https://github.com/test/repo.git",
-            result=None,
-            sandbox_id=None,
-            session_id=None,
-            parent_task_id=None,
-            created_at="2025-01-01T00:00:00Z",
-            updated_at="2025-01-01T00:00:00Z",
-        ),
-        TaskResponse(
-            id=str(TEST_UUID_2),
-            status="running",
-            prompt="Test task",
-            repository_url="https://github.com/test/repo.git",
-            result=None,
-            sandbox_id=None,
-            session_id=None,
-            parent_task_id=None,
-            created_at="2025-01-01T00:00:00Z",
-            updated_at="2025-01-01T00:00:00Z",
-        ),
-        TaskResponse(
-            id=str(TEST_UUID_2),
-            status="failed",
-            prompt="Test task",
-            repository_url="https://github.com/test/repo.git",
-            result="Error occurred",
-            sandbox_id=None,
-            session_id=None,
-            parent_task_id=None,
-            created_at="2025-01-01T00:00:00Z",
-            updated_at="2025-01-01T00:00:00Z",
-        ),
+        task_response(status="pending"),
+        task_response(status="running"),
+        task_response(status=final_status, result="Done"),
     ]
 
-    result = ApiClientService.wait_for_task(str(TEST_UUID_2), poll_interval=3)
+    result = ApiClientService.wait_for_task(
+        str(TEST_UUID_1), poll_interval=poll_interval
+    )
 
-    assert str(result.id) == str(TEST_UUID_2)
-    assert result.status == "failed"
-    assert result.result == "Error occurred"
+    assert str(result.id) == str(TEST_UUID_1)
+    assert result.status == final_status
+    assert result.result == "Done"
     assert mock_get_task.call_count == 3
-    assert mock_sleep.call_count == 2
-    mock_sleep.assert_called_with(3)
+    # Should sleep twice (after first two polls), backing off by 1.5x
+    assert [call.args[0] for call in mock_sleep.call_args_list] == expected_delays
 
 
-def test_wait_for_task_custom_poll_interval(mocker):
+@patch.object(ApiClientService, "get_task")
+def test_wait_for_task_custom_poll_interval(mock_get_task, mock_sleep):
     """Test wait_for_task respects custom poll interval."""
-    from app.api.tasks import TaskResponse
-
-    mock_get_task = mocker.patch.object(ApiClientService, "get_task")
-    mock_sleep = mocker.patch("time.sleep")
 
     mock_get_task.side_effect = [
-        TaskResponse(
-            id=str(TEST_UUID_1),
-            status="pending",
-            prompt="Test task",
-            repository_url="https://github.com/test/repo.git",
-            result=None,
-            sandbox_id=None,
-            session_id=None,
-            parent_task_id=None,
-            created_at="2025-01-01T00:00:00Z",
-            updated_at="2025-01-01T00:00:00Z",
-        ),
-        TaskResponse(
-            id=str(TEST_UUID_1),
-            status="completed",
-            prompt="Test task",
-            repository_url="https://github.com/test/repo.git",
-            result=None,
-            sandbox_id=None,
-            session_id=None,
-            parent_task_id=None,
-            created_at="2025-01-01T00:00:00Z",
-            updated_at="2025-01-01T00:00:00Z",
-        ),
+        task_response(status="pending"),
+        task_response(status="completed"),
     ]
 
     ApiClientService.wait_for_task(str(TEST_UUID_1), poll_interval=10)
@@ -494,30 +354,16 @@ def test_wait_for_task_custom_poll_interval(mocker):
     mock_sleep.assert_called_once_with(10)
 
 
-def test_wait_for_task_timeout(mocker):
+@patch.object(ApiClientService, "get_task")
+def test_wait_for_task_timeout(mock_get_task, mocker, mock_sleep):
     """Test wait_for_task raises TimeoutError when timeout exceeded."""
-    from app.api.tasks import TaskResponse
-
-    mock_get_task = mocker.patch.object(ApiClientService, "get_task")
-    mock_sleep = mocker.patch("time.sleep")
-    mock_time = mocker.patch("time.time")
+    mock_monotonic = mocker.patch.object(time, "monotonic")
 
     # Simulate time progression to exceed timeout
-    # Start time: 0, first check: 5, second check: 11 (exceeds timeout of 10)
-    mock_time.side_effect = [0, 5, 11]
+    # Start: 0, first check: 5, after request: 5, second check: 11 (exceeds 10)
+    mock_monotonic.side_effect = [0, 5, 5, 11]
 
-    mock_get_task.return_value = TaskResponse(
-        id=str(TEST_UUID_1),
-        status="running",
-        prompt="Test task",
-        repository_url="https://github.com/test/repo.git",
-        result=None,
-        sandbox_id=None,
-        session_id=None,
-        parent_task_id=None,
-        created_at="2025-01-01T00:00:00Z",
-        updated_at="2025-01-01T00:00:00Z",
-    )
+    mock_get_task.return_value = task_response(status="running")
 
     with pytest.raises(TimeoutError) as exc_info:
         ApiClientService.wait_for_task(str(TEST_UUID_1), timeout=10, poll_interval=5)
@@ -528,13 +374,13 @@ def test_wait_for_task_timeout(mocker):
     mock_sleep.assert_called_once_with(5)
 
 
-def test_wait_for_task_timeout_on_first_check(mocker):
+@patch.object(ApiClientService, "get_task")
+def test_wait_for_task_timeout_on_first_check(mock_get_task, mocker):
     """Test wait_for_task raises TimeoutError immediately if already timed out."""
-    mock_get_task = mocker.patch.object(ApiClientService, "get_task")
-    mock_time = mocker.patch("time.time")
+    mock_monotonic = mocker.patch.object(time, "monotonic")
 
     # Simulate already exceeded timeout
-    mock_time.side_effect = [0, 11]
+    mock_monotonic.side_effect = [0, 11]
 
     with pytest.raises(TimeoutError) as exc_info:
         ApiClientService.wait_for_task(str(TEST_UUID_1), timeout=10)
@@ -544,13 +390,13 @@ def test_wait_for_task_timeout_on_first_check(mocker):
     mock_get_task.assert_not_called()
 
 
-def test_wait_for_task_default_timeout(mocker):
+@patch.object(ApiClientService, "get_task")
+def test_wait_for_task_default_timeout(mock_get_task, mocker):
     """Test wait_for_task uses default timeout of 600 seconds."""
-    mocker.patch.object(ApiClientService, "get_task")
-    mock_time = mocker.patch("time.time")
+    mock_monotonic = mocker.patch.object(time, "monotonic")
 
     # Simulate time progression to exceed default timeout
-    mock_time.side_effect = [0, 601]
+    mock_monotonic.side_effect = [0, 601]
 
     with pytest.raises(TimeoutError) as exc_info:
         ApiClientService.wait_for_task(str(TEST_UUID_1))
@@ -558,58 +404,263 @@ def test_wait_for_task_default_timeout(mocker):
     assert f"Task {TEST_UUID_1} did not complete within 600s" in str(exc_info.value)
 
 
-def test_wait_for_task_http_error(mocker):
-    """Test wait_for_task propagates HTTP errors from get_task."""
-    mock_get_task = mocker.patch.object(ApiClientService, "get_task")
-    mock_get_task.side_effect = httpx.HTTPStatusError(
-        "Internal Server Error",
-        request=mocker.Mock(),
-        response=mocker.Mock(status_code=500),
+def status_error(status_code: int) -> httpx.HTTPStatusError:
+    """Build the error get_task raises for an HTTP error response."""
+    request = httpx.Request("GET", f"http://test/v1/tasks/{TEST_UUID_1}")
+    return httpx.HTTPStatusError(
+        f"HTTP {status_code}",
+        request=request,
+        response=httpx.Response(status_code, request=request),
     )
 
+
+@patch.object(ApiClientService, "get_task")
+def test_wait_for_task_http_error(mock_get_task, mock_sleep):
+    """Test wait_for_task propagates client errors from get_task."""
+    mock_get_task.side_effect = status_error(404)
+
     with pytest.raises(httpx.HTTPStatusError):
         ApiClientService.wait_for_task(str(TEST_UUID_1))
 
+    mock_get_task.assert_called_once()
+    mock_sleep.assert_not_called()
 
-def test_wait_for_task_many_polls(mocker):
-    """Test wait_for_task handles many polling iterations."""
-    from app.api.tasks import TaskResponse
 
-    mock_get_task = mocker.patch.object(ApiClientService, "get_task")
-    mock_sleep = mocker.patch("time.sleep")
+@patch.object(ApiClientService, "get_task")
+def test_wait_for_task_retries_transient_errors(mock_get_task, mock_sleep):
+    """Test wait_for_task retries 5xx and network errors with x2 backoff."""
+    mock_get_task.side_effect = [
+        status_error(500),
+        httpx.ConnectError("Connection refused"),
+        task_response(status="running"),
+        status_error(503),
+        task_response(status="completed"),
+    ]
+
+    result = ApiClientService.wait_for_task(str(TEST_UUID_1), poll_interval=5)
+
+    assert result.status == "completed"
+    # The error backoff resets after a successful check
+    assert [call.args[0] for call in mock_sleep.call_args_list] == [5, 10, 5, 5]
+
+
+@patch.object(ApiClientService, "get_task")
+def test_wait_for_task_many_polls(mock_get_task, mock_sleep):
+    """Test wait_for_task handles many polling iterations."""
 
     # Simulate 10 polls before completion
-    pending_responses = [
-        TaskResponse(
-            id=str(TEST_UUID_1),
-            status="running",
-            prompt="Test task",
-            repository_url="https://github.com/test/repo.git",
-            result=None,
-            sandbox_id=None,
-            session_id=None,
-            parent_task_id=None,
-            created_at="2025-01-01T00:00:00Z",
-            updated_at="2025-01-01T00:00:00Z",
-        )
-    ] * 9
-    completed_response = TaskResponse(
-        id=str(TEST_UUID_1),
-        status="completed",
-        prompt="Test task",
-        repository_url="https://github.com/test/repo.git",
-        result=None,
-        sandbox_id=None,
-        session_id=None,
-        parent_task_id=None,
-        created_at="2025-01-01T00:00:00Z",
-        updated_at="2025-01-01T00:00:00Z",
-    )
+    pending_responses = [task_response(status="running")] * 9
+    completed_response = task_response(status="completed")
     mock_get_task.side_effect = [*pending_responses, completed_response]
 
     result = ApiClientService.wait_for_task(str(TEST_UUID_1), poll_interval=2)
 
     assert result.status == "completed"
     assert mock_get_task.call_count == 10
-    assert mock_sleep.call_count == 9
-    mock_sleep.assert_called_with(2)
+    delays = [call.args[0] for call in mock_sleep.call_args_list]
+    assert len(delays) == 9
+    assert delays[0] == 2
+    assert delays == sorted(delays)
+    # Backoff is capped at max_interval
+    assert delays[-2:] == [30, 30]
+
+
+@patch.object(ApiClientService, "get_task")
+def test_wait_for_task_backoff_jitter(mock_get_task, mocker, mock_sleep):
+    """Test wait_for_task applies +/-20% jitter to the capped delay."""
+    mock_uniform = mocker.patch.object(random, "uniform", return_value=1.2)
+
+    running = task_response(status="running")
+    completed = task_response(status="completed")
+    mock_get_task.side_effect = [running, running, completed]
+
+    ApiClientService.wait_for_task(str(TEST_UUID_1), poll_interval=10, max_interval=12)
+
+    mock_uniform.assert_called_with(0.8, 1.2)
+    assert [call.args[0] for call in mock_sleep.call_args_list] == pytest.approx(
+        [12.0, 14.4]
+    )
+
+
+@pytest.mark.parametrize(
+    ("request_seconds", "expected_sleep"),
+    [
+        pytest.param(2, 3, id="fast_request"),
+        pytest.param(7, 0, id="request_slower_than_interval"),
+    ],
+)
+@patch.object(ApiClientService, "get_task")
+def test_wait_for_task_subtracts_request_latency(
+    mock_get_task, mocker, mock_sleep, request_seconds, expected_sleep
+):
+    """Test wait_for_task sleeps only for what's left of the poll interval."""
+    mocker.patch.object(
+        time, "monotonic", side_effect=[0, 0, request_seconds, request_seconds]
+    )
+
+    mock_get_task.side_effect = [
+        task_response(status="running"),
+        task_response(status="completed"),
+    ]
+
+    ApiClientService.wait_for_task(str(TEST_UUID_1), poll_interval=5)
+
+    mock_sleep.assert_called_once_with(expected_sleep)
+
+
+@pytest.mark.anyio
+async def test_wait_for_task_async_concurrent():
+    """Test many wait_for_task_async calls share one client and run concurrently."""
+    task_ids = [UUID(int=i) for i in range(20)]
+    polls: dict[str, int] = {}
+    in_flight = peak_in_flight = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak_in_flight
+        in_flight += 1
+        peak_in_flight = max(peak_in_flight, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+
+        # Each task is running on its first poll and completed on its second
+        task_id = request.url.path.rsplit("/", 1)[-1]
+        polls[task_id] = polls.get(task_id, 0) + 1
+        status = "completed" if polls[task_id] == 2 else "running"
+        return httpx.Response(200, json=task_json(UUID(task_id), status=status))
+
+    async with httpx.AsyncClient(
+        transport=httpx.MockTransport(handler), base_url="http://test"
+    ) as client:
+        results = await asyncio.gather(
+            *(
+                ApiClientService.wait_for_task_async(
+                    str(task_id), poll_interval=0, client=client
+                )
+                for task_id in task_ids
+            )
+        )
+
+    assert [result.id for result in results] == task_ids
+    assert all(result.status == "completed" for result in results)
+    assert sum(polls.values()) == 40
+    # Every first poll was in flight before any of them returned
+    assert peak_in_flight == len(task_ids)
+
+
+@pytest.fixture
+def async_sleep(monkeypatch) -> list[float]:
+    """Replace asyncio.sleep with one that advances the monotonic clock.
+
+    Returns the list of delays wait_for_task_async slept for.
+    """
+    now = 0.0
+    delays = []
+
+    async def sleep(delay: float) -> None:
+        nonlocal now
+        delays.append(delay)
+        now += delay
+
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    return delays
+
+
+def async_handler(*responses: tuple[int, str | None]):
+    """Build an async transport handler returning (status, task status) in turn.
+
+    Returns the handler and the list of requests it has received.
+    """
+    requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        status_code, status = responses[min(len(requests), len(responses) - 1)]
+        requests.append(request)
+        body = task_json(TEST_UUID_1, status=status) if status else None
+        return httpx.Response(status_code, json=body)
+
+    return handler, requests
+
+
+def make_async_client(
+    *responses: tuple[int, str | None],
+) -> tuple[httpx.AsyncClient, list[httpx.Request]]:
+    """Build a real httpx.AsyncClient returning the given responses in turn."""
+    handler, requests = async_handler(*responses)
+    client = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler), base_url="http://test"
+    )
+    return client, requests
+
+
+@pytest.mark.anyio
+async def test_wait_for_task_async_timeout(async_sleep):
+    """Test wait_for_task_async raises TimeoutError when timeout exceeded."""
+    client, requests = make_async_client((200, "running"))
+
+    async with client:
+        with pytest.raises(TimeoutError) as exc_info:
+            await ApiClientService.wait_for_task_async(
+                str(TEST_UUID_1), timeout=10, poll_interval=5, client=client
+            )
+
+    assert f"Task {TEST_UUID_1} did not complete within 10s" in str(exc_info.value)
+    # Polls at 0s and 5s; the clock is at 12.5s when the third check is due
+    assert len(requests) == 2
+    assert async_sleep == [5, 7.5]
+
+
+@pytest.mark.anyio
+async def test_wait_for_task_async_retries_transient_errors(async_sleep):
+    """Test wait_for_task_async retries a server error and then succeeds."""
+    client, requests = make_async_client((503, None), (200, "completed"))
+
+    async with client:
+        result = await ApiClientService.wait_for_task_async(
+            str(TEST_UUID_1), poll_interval=5, client=client
+        )
+
+    assert result.status == "completed"
+    assert len(requests) == 2
+    assert async_sleep == [5]
+
+
+@pytest.mark.anyio
+async def test_wait_for_task_async_http_error(async_sleep):
+    """Test wait_for_task_async raises client errors without retrying."""
+    client, requests = make_async_client((404, None))
+
+    async with client:
+        with pytest.raises(httpx.HTTPStatusError) as exc_info:
+            await ApiClientService.wait_for_task_async(str(TEST_UUID_1), client=client)
+
+    assert exc_info.value.response.status_code == 404
+    assert len(requests) == 1
+    assert async_sleep == []
+
+
+@pytest.mark.anyio
+async def test_wait_for_task_async_creates_client(monkeypatch, async_sleep):
+    """Test wait_for_task_async without a client opens and closes a pooled one."""
+    handler, requests = async_handler((200, "running"), (200, "completed"))
+    created = []
+
+    class RecordingClient(httpx.AsyncClient):
+        def __init__(self, **kwargs):
+            created.append((self, kwargs))
+            super().__init__(transport=httpx.MockTransport(handler), **kwargs)
+
+    monkeypatch.setattr(httpx, "AsyncClient", RecordingClient)
+
+    result = await ApiClientService.wait_for_task_async(
+        str(TEST_UUID_1), poll_interval=5
+    )
+
+    assert result.status == "completed"
+    assert len(requests) == 2
+    # One client serves every poll and is closed once the wait is over
+    [(client, kwargs)] = created
+    assert kwargs["limits"] == httpx.Limits(
+        max_keepalive_connections=50, keepalive_expiry=30
+    )
+    assert client.is_closed
@@ -1,98 +1,105 @@
 """Tests for GitService."""
 
 import subprocess
+from dataclasses import dataclass, field
+from types import SimpleNamespace
 
 import pytest
 
 from app.services.git import GitError, GitService
 
-
-def test_get_current_repo_https_url(mocker):
-    """Test getting current repo with HTTPS URL."""
-    mock_run = mocker.patch("subprocess.run")
-    mock_run.return_value = mocker.Mock(
-        stdout="https://github.com/test-org/test-repo.git\n",
-        returncode=0,
-    )
-
-    repo_url, org_repo = GitService.get_current_repo()
-
-    assert repo_url == "https://github.com/test-org/test-repo.git"
-    assert org_repo == "test-org/test-repo"
-    mock_run.assert_called_once_with(
-        ["git", "remote", "get-url", "origin"],
-        capture_output=True,
-        text=True,
-        check=True,
-    )
-
-
-def test_get_current_repo_ssh_url(mocker):
-    """Test getting current repo with SSH URL."""
-    mock_run = mocker.patch("subprocess.run")
-    mock_run.return_value = mocker.Mock(
-        stdout="git@github.com:test-org/test-repo.git\n",
-        returncode=0,
-    )
-
-    repo_url, org_repo = GitService.get_current_repo()
-
-    # Should convert SSH to HTTPS
-    assert repo_url == "https://github.com/test-org/test-repo.git"
-    assert org_repo == "test-org/test-repo"
-
-
-def test_get_current_repo_https_url_without_git_extension(mocker):
-    """Test getting current repo with HTTPS URL without .git extension."""
-    mock_run = mocker.patch("subprocess.run")
-    mock_run.return_value = mocker.Mock(
-        stdout="https://github.com/test-org/test-repo\n",
-        returncode=0,
-    )
-
-    repo_url, org_repo = GitService.get_current_repo()
-
-    assert repo_url == "https://github.com/test-org/test-repo.git"
-    assert org_repo == "test-org/test-repo"
-
-
-def test_get_current_repo_ssh_url_without_git_extension(mocker):
-    """Test getting current repo with SSH URL without .git extension."""
-    mock_run = mocker.patch("subprocess.run")
-    mock_run.return_value = mocker.Mock(
-        stdout="git@github.com:test-org/test-repo\n",
-        returncode=0,
-    )
+GET_URL_CMD = ["git", "remote", "get-url", "origin"]
+
+
+@dataclass
+class FakeGit:
+    """Canned result for subprocess.run, plus the calls made to it."""
+
+    stdout: str = ""
+    error: Exception | None = None
+    calls: list = field(default_factory=list)
+
+
+@pytest.fixture
+def fake_git(monkeypatch):
+    """Replace subprocess.run with a plain function instead of a MagicMock."""
+    fake = FakeGit()
+
+    def run(*args, **kwargs):
+        fake.calls.append((args, kwargs))
+        if fake.error is not None:
+            raise fake.error
+        return SimpleNamespace(stdout=fake.stdout, returncode=0)
+
+    monkeypatch.setattr(subprocess, "run", run)
+    return fake
+
+
+@pytest.mark.parametrize(
+    ("remote_url", "expected_url", "expected_org_repo"),
+    [
+        pytest.param(
+            "https://github.com/test-org/test-repo.git",
+            "https://github.com/test-org/test-repo.git",
+            "test-org/test-repo",
+            id="https",
+        ),
+        pytest.param(
+            "git@github.com:test-org/test-repo.git",
+            "https://github.com/test-org/test-repo.git",
+            "test-org/test-repo",
+            id="ssh",
+        ),
+        pytest.param(
+            "https://github.com/test-org/test-repo",
+            "https://github.com/test-org/test-repo.git",
+            "test-org/test-repo",
+            id="https_without_git_extension",
+        ),
+        pytest.param(
+            "git@github.com:test-org/test-repo",
+            "https://github.com/test-org/test-repo.git",
+            "test-org/test-repo",
+            id="ssh_without_git_extension",
+        ),
+        pytest.param(
+            "https://github.com/test.org/test.repo.git",
+            "https://github.com/test.org/test.repo.git",
+            "test.org/test.repo",
+            id="dots",
+        ),
+        pytest.param(
+            "https://github.com/test_org/test_repo.git",
+            "https://github.com/test_org/test_repo.git",
+            "test_org/test_repo",
+            id="underscores",
+        ),
+    ],
+)
+def test_get_current_repo(fake_git, remote_url, expected_url, expected_org_repo):
+    """Test getting current repo; SSH remotes are converted to HTTPS with .git."""
+    fake_git.stdout = f"{remote_url}\n"
 
     repo_url, org_repo = GitService.get_current_repo()
 
-    # Should convert SSH to HTTPS and add .git
-    assert repo_url == "https://github.com/test-org/test-repo.git"
-    assert org_repo == "test-org/test-repo"
-
-
-def test_get_current_repo_no_git_repository(mocker):
-    """Test getting current repo when not in a git repository."""
-    mock_run = mocker.patch("subprocess.run")
-    mock_run.side_effect = subprocess.CalledProcessError(
-        returncode=128,
-        cmd=["git", "remote", "get-url", "origin"],
-        stderr="fatal: not a git repository",
-    )
-
-    with pytest.raises(GitError) as exc_info:
-        GitService.get_current_repo()
-
-    assert "Not in a git repository or no remote 'origin' found" in str(exc_info.value)
-
-
-def test_get_current_repo_no_remote_origin(mocker):
-    """Test getting current repo when no remote 'origin' exists."""
-    mock_run = mocker.patch("subprocess.run")
-    mock_run.side_effect = subprocess.CalledProcessError(
-        returncode=128,
-        cmd=["git", "remote", "get-url", "origin"],
-        stderr="fatal: No such remote 'origin'",
+    assert repo_url == expected_url
+    assert org_repo == expected_org_repo
+    assert fake_git.calls == [
+        ((GET_URL_CMD,), {"capture_output": True, "text": True, "check": True})
+    ]
+
+
+@pytest.mark.parametrize(
+    "stderr",
+    [
+        pytest.param("fatal: not a git repository", id="no_git_repository"),
+        pytest.param("fatal: No such remote 'origin'", id="no_remote_origin"),
+    ],
+)
+def test_get_current_repo_git_error(fake_git, stderr):
+    """Test getting current repo outside a git repo or without an origin remote."""
+    fake_git.error = subprocess.CalledProcessError(
+        returncode=128, cmd=GET_URL_CMD, stderr=stderr
     )
 
     with pytest.raises(GitError) as exc_info:
@@ -101,13 +108,9 @@ def test_get_current_repo_no_remote_origin(mocker):
     assert "Not in a git repository or no remote 'origin' found" in str(exc_info.value)
 
 
-def test_get_current_repo_invalid_url_format(mocker):
+def test_get_current_repo_invalid_url_format(fake_git):
     """Test getting current repo with invalid URL format."""
-    mock_run = mocker.patch("subprocess.run")
-    mock_run.return_value = mocker.Mock(
-        stdout="https://gitlab.com/test-org/test-repo.git\n",
-        returncode=0,
-    )
+    fake_git.stdout = "https://gitlab.com/test-org/test-repo.git\n"
 
     with pytest.raises(GitError) as exc_info:
         GitService.get_current_repo()
@@ -115,112 +118,61 @@ def test_get_current_repo_invalid_url_format(mocker):
     assert "Could not parse GitHub repo from remote URL" in str(exc_info.value)
 
 
-def test_get_current_repo_with_org_containing_dots(mocker):
-    """Test getting current repo with org/repo name containing dots."""
-    mock_run = mocker.patch("subprocess.run")
-    mock_run.return_value = mocker.Mock(
-        stdout="https://github.com/test.org/test.repo.git\n",
-        returncode=0,
-    )
-
-    repo_url, org_repo = GitService.get_current_repo()
-
-    assert repo_url == "https://github.com/test.org/test.repo.git"
-    assert org_repo == "test.org/test.repo"
-
-
-def test_get_current_repo_with_org_containing_hyphens(mocker):
-    """Test getting current repo with org/repo name containing hyphens."""
-    mock_run = mocker.patch("subprocess.run")
-    mock_run.return_value = mocker.Mock(
-        stdout="https://github.com/test-org/test-repo.git\n",
-        returncode=0,
-    )
-
-    repo_url, org_repo = GitService.get_current_repo()
-
-    assert repo_url == "https://github.com/test-org/test-repo.git"
-    assert org_repo == "test-org/test-repo"
-
-
-def test_get_current_repo_with_org_containing_underscores(mocker):
-    """Test getting current repo with org/repo name containing underscores."""
-    mock_run = mocker.patch("subprocess.run")
-    mock_run.return_value = mocker.Mock(
-        stdout="https://github.com/test_org/test_repo.git\n",
-        returncode=0,
-    )
-
-    repo_url, org_repo = GitService.get_current_repo()
-
-    assert repo_url == "https://github.com/test_org/test_repo.git"
-    assert org_repo == "test_org/test_repo"
-
-
-def test_normalize_repo_url_org_name_format():
-    """Test normalize_repo_url with org/name format."""
-    result = GitService.normalize_repo_url("myorg/myrepo")
-    assert result == "https://github.com/myorg/myrepo.git"
-
-
-def test_normalize_repo_url_org_name_with_hyphens():
-    """Test normalize_repo_url with org/name containing hyphens."""
-    result = GitService.normalize_repo_url("my-org/my-repo")
-    assert result == "https://github.com/my-org/my-repo.git"
-
-
-def test_normalize_repo_url_org_name_with_underscores():
-    """Test normalize_repo_url with org/name containing underscores."""
-    result = GitService.normalize_repo_url("my_org/my_repo")
-    assert result == "https://github.com/my_org/my_repo.git"
-
-
-def test_normalize_repo_url_org_name_with_dots():
-    """Test normalize_repo_url with org/name containing dots."""
-    result = GitService.normalize_repo_url("my.org/my.repo")
-    assert result == "https://github.com/my.org/my.repo.git"
-
-
-def test_normalize_repo_url_https_with_git_extension():
-    """Test normalize_repo_url with full HTTPS URL ending in .git."""
-    result = GitService.normalize_repo_url("https://github.com/myorg/myrepo.git")
-    assert result == "https://github.com/myorg/myrepo.git"
-
-
-def test_normalize_repo_url_https_without_git_extension():
-    """Test normalize_repo_url with full HTTPS URL without .git extension."""
-    result = GitService.normalize_repo_url("https://github.com/myorg/myrepo")
-    assert result == "https://github.com/myorg/myrepo.git"
-
-
-def test_normalize_repo_url_http_with_git_extension():
-    """Test normalize_repo_url with HTTP URL (converts to HTTPS)."""
-    result = GitService.normalize_repo_url("http://github.com/myorg/myrepo.git")
-    assert result == "https://github.com/myorg/myrepo.git"
-
-
-def test_normalize_repo_url_http_without_git_extension():
-    """Test normalize_repo_url with HTTP URL without .git extension."""
-    result = GitService.normalize_repo_url("http://github.com/myorg/myrepo")
-    assert result == "https://github.com/myorg/myrepo.git"
-
-
-def test_normalize_repo_url_ssh_with_git_extension():
-    """Test normalize_repo_url with SSH URL."""
-    result = GitService.normalize_repo_url("git@github.com:myorg/myrepo.git")
-    assert result == "https://github.com/myorg/myrepo.git"
-
-
-def test_normalize_repo_url_ssh_without_git_extension():
-    """Test normalize_repo_url with SSH URL without .git extension."""
-    result = GitService.normalize_repo_url("git@github.com:myorg/myrepo")
-    assert result == "https://github.com/myorg/myrepo.git"
-
-
-def test_normalize_repo_url_complex_org_name():
-    """Test normalize_repo_url with complex org/repo names."""
-    result = GitService.normalize_repo_url("my-org.test_123/my-repo.test_456")
-    assert result == "https://github.com/my-org.test_123/my-repo.test_456.git"
+@pytest.mark.parametrize(
+    ("repo", "expected"),
+    [
+        pytest.param(
+            "myorg/myrepo", "https://github.com/myorg/myrepo.git", id="org_name"
+        ),
+        pytest.param(
+            "my-org/my-repo", "https://github.com/my-org/my-repo.git", id="hyphens"
+        ),
+        pytest.param(
+            "my_org/my_repo", "https://github.com/my_org/my_repo.git", id="underscores"
+        ),
+        pytest.param(
+            "my.org/my.repo", "https://github.com/my.org/my.repo.git", id="dots"
+        ),
+        pytest.param(
+            "https://github.com/myorg/myrepo.git",
+            "https://github.com/myorg/myrepo.git",
+            id="https",
+        ),
+        pytest.param(
+            "https://github.com/myorg/myrepo",
+            "https://github.com/myorg/myrepo.git",
+            id="https_without_git_extension",
+        ),
+        pytest.param(
+            "http://github.com/myorg/myrepo.git",
+            "https://github.com/myorg/myrepo.git",
+            id="http",
+        ),
+        pytest.param(
+            "http://github.com/myorg/myrepo",
+            "https://github.com/myorg/myrepo.git",
+            id="http_without_git_extension",
+        ),
+        pytest.param(
+            "git@github.com:myorg/myrepo.git",
+            "https://github.com/myorg/myrepo.git",
+            id="ssh",
+        ),
+        pytest.param(
+            "git@github.com:myorg/myrepo",
+            "https://github.com/myorg/myrepo.git",
+            id="ssh_without_git_extension",
+        ),
+        pytest.param(
+            "my-org.test_123/my-repo.test_456",
+            "https://github.com/my-org.test_123/my-repo.test_456.git",
+            id="complex_org_name",
+        ),
+    ],
+)
+def test_normalize_repo_url(repo, expected):
+    """Test normalize_repo_url turns every supported form into an HTTPS URL."""
+    assert GitService.normalize_repo_url(repo) == expected
 
 
 def test_normalize_repo_url_invalid_url_raises_error():
@@ -230,73 +182,47 @@ def test_normalize_repo_url_invalid_url_raises_error():
     assert "Could not parse GitHub repo from URL" in str(exc_info.value)
 
 
-def test_parse_github_url_https_with_git():
-    """Test parse_github_url with HTTPS URL ending in .git."""
-    url, org_repo = GitService.parse_github_url("https://github.com/myorg/myrepo.git")
-    assert url == "https://github.com/myorg/myrepo.git"
-    assert org_repo == "myorg/myrepo"
-
-
-def test_parse_github_url_https_without_git():
-    """Test parse_github_url with HTTPS URL without .git extension."""
-    url, org_repo = GitService.parse_github_url("https://github.com/myorg/myrepo")
-    assert url == "https://github.com/myorg/myrepo.git"
-    assert org_repo == "myorg/myrepo"
-
-
-def test_parse_github_url_http_with_git():
-    """Test parse_github_url with HTTP URL (still returns HTTPS)."""
-    url, org_repo = GitService.parse_github_url("http://github.com/myorg/myrepo.git")
-    assert url == "https://github.com/myorg/myrepo.git"
-    assert org_repo == "myorg/myrepo"
-
-
-def test_parse_github_url_ssh_with_git():
-    """Test parse_github_url with SSH URL."""
-    url, org_repo = GitService.parse_github_url("git@github.com:myorg/myrepo.git")
-    assert url == "https://github.com/myorg/myrepo.git"
-    assert org_repo == "myorg/myrepo"
-
-
-def test_parse_github_url_ssh_without_git():
-    """Test parse_github_url with SSH URL without .git extension."""
-    url, org_repo = GitService.parse_github_url("git@github.com:myorg/myrepo")
-    assert url == "https://github.com/myorg/myrepo.git"
-    assert org_repo == "myorg/myrepo"
-
-
-def test_parse_github_url_with_special_characters():
-    """Test parse_github_url with org/repo names containing special characters."""
-    url, org_repo = GitService.parse_github_url(
-        "https://github.com/my-org.test_123/my-repo.test_456.git"
-    )
-    assert url == "https://github.com/my-org.test_123/my-repo.test_456.git"
-    assert org_repo == "my-org.test_123/my-repo.test_456"
-
-
-def test_parse_github_url_invalid_not_github():
-    """Test parse_github_url with non-GitHub URL raises ValueError."""
-    with pytest.raises(ValueError) as exc_info:
-        GitService.parse_github_url("https://gitlab.com/myorg/myrepo.git")
-    assert "Could not parse GitHub repo from URL" in str(exc_info.value)
-
-
-def test_parse_github_url_invalid_missing_org_repo():
-    """Test parse_github_url with URL missing org/repo raises ValueError."""
-    with pytest.raises(ValueError) as exc_info:
-        GitService.parse_github_url("https://github.com/")
-    assert "Could not parse GitHub repo from URL" in str(exc_info.value)
-
-
-def test_parse_github_url_invalid_only_org():
-    """Test parse_github_url with URL containing only org raises ValueError."""
-    with pytest.raises(ValueError) as exc_info:
-        GitService.parse_github_url("https://github.com/myorg")
-    assert "Could not parse GitHub repo from URL" in str(exc_info.value)
-
-
-def test_parse_github_url_invalid_malformed():
-    """Test parse_github_url with malformed URL raises ValueError."""
+@pytest.mark.parametrize(
+    ("repo", "expected_org_repo"),
+    [
+        pytest.param("https://github.com/myorg/myrepo.git", "myorg/myrepo", id="https"),
+        pytest.param(
+            "https://github.com/myorg/myrepo",
+            "myorg/myrepo",
+            id="https_without_git_extension",
+        ),
+        pytest.param("http://github.com/myorg/myrepo.git", "myorg/myrepo", id="http"),
+        pytest.param("git@github.com:myorg/myrepo.git", "myorg/myrepo", id="ssh"),
+        pytest.param(
+            "git@github.com:myorg/myrepo",
+            "myorg/myrepo",
+            id="ssh_without_git_extension",
+        ),
+        pytest.param(
+            "https://github.com/my-org.test_123/my-repo.test_456.git",
+            "my-org.test_123/my-repo.test_456",
+            id="special_characters",
+        ),
+    ],
+)
+def test_parse_github_url(repo, expected_org_repo):
+    """Test parse_github_url returns org/repo and an HTTPS URL ending in .git."""
+    url, org_repo = GitService.parse_github_url(repo)
+    assert url == f"https://github.com/{expected_org_repo}.git"
+    assert org_repo == expected_org_repo
+
+
+@pytest.mark.parametrize(
+    "repo",
+    [
+        pytest.param("https://gitlab.com/myorg/myrepo.git", id="not_github"),
+        pytest.param("https://github.com/", id="missing_org_repo"),
+        pytest.param("https://github.com/myorg", id="only_org"),
+        pytest.param("not-a-url", id="malformed"),
+    ],
+)
+def test_parse_github_url_invalid(repo):
+    """Test parse_github_url raises ValueError for non-repository URLs."""
     with pytest.raises(ValueError) as exc_info:
-        GitService.parse_github_url("not-a-url")
+        GitService.parse_github_url(repo)
     assert "Could not parse GitHub repo from URL" in str(exc_info.value)
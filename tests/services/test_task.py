@@ -1,13 +1,32 @@
 """Tests for TaskService."""
 
 import json
+from pathlib import Path
 from uuid import uuid4
 
 import pytest
 
 from app.core.errors import NotFoundError
 from app.services import TaskService
-from tests.conftest import create_test_task
+from app.services import task as task_service
+from tests.conftest import create_test_task, create_test_tasks
+
+pytestmark = pytest.mark.usefixtures("clean_db")
+
+# session.jsonl contents shared by the get_task_logs tests
+MESSAGE_LINES = [
+    json.dumps({"type": f"Message{i}", "data": {}}).encode() + b"\n" for i in range(10)
+]
+PAGINATION_LOG = b"".join(MESSAGE_LINES)
+EMPTY_LINES_LOG = MESSAGE_LINES[0] + b"\n" + b"   \n" + MESSAGE_LINES[1]
+INVALID_JSON_LOG = MESSAGE_LINES[0] + b"not valid json\n" + MESSAGE_LINES[1]
+
+
+def session_log_file(task_logs_dir: Path, task) -> Path:
+    """Return the task's session.jsonl path, creating its directory."""
+    task_dir = task_logs_dir / str(task.id)
+    task_dir.mkdir(parents=True)
+    return task_dir / "session.jsonl"
 
 
 def test_create_task():
@@ -55,7 +74,8 @@ def test_list_tasks():
     create_test_task(prompt="Task 3")
 
     # List all tasks
-    tasks, total = TaskService.list_tasks(limit=10, offset=0)
+    tasks = TaskService.list_tasks(limit=10, offset=0)
+    total = TaskService.count_tasks()
 
     assert len(tasks) == 3
     assert total == 3
@@ -67,21 +87,66 @@ def test_list_tasks():
 def test_list_tasks_pagination():
     """Test task list pagination."""
     # Create multiple tasks
-    for i in range(5):
-        create_test_task(prompt=f"Task {i}")
+    created = create_test_tasks([f"Task {i}" for i in range(5)])
+
+    assert TaskService.count_tasks() == 5
 
     # Get first page
-    tasks_page1, total = TaskService.list_tasks(limit=2, offset=0)
+    tasks_page1 = TaskService.list_tasks(limit=2, offset=0)
     assert len(tasks_page1) == 2
-    assert total == 5
 
     # Get second page
-    tasks_page2, total = TaskService.list_tasks(limit=2, offset=2)
+    tasks_page2 = TaskService.list_tasks(limit=2, offset=2)
     assert len(tasks_page2) == 2
-    assert total == 5
 
-    # Ensure pages are different
-    assert tasks_page1[0].id != tasks_page2[0].id
+    # Pages are disjoint and the last page holds the remainder
+    ids_page1 = {task.id for task in tasks_page1}
+    ids_page2 = {task.id for task in tasks_page2}
+    ids_page3 = {task.id for task in TaskService.list_tasks(limit=2, offset=4)}
+    assert ids_page1.isdisjoint(ids_page2)
+    assert ids_page1 | ids_page2 | ids_page3 == {task.id for task in created}
+
+
+def test_list_tasks_cursor_pagination():
+    """Test threading the last task of each page back in as the cursor."""
+    create_test_tasks([f"Task {i}" for i in range(5)])
+
+    seen = []
+    cursor = None
+    for expected_len in (2, 2, 1):
+        tasks = TaskService.list_tasks(limit=2, cursor=cursor)
+        assert len(tasks) == expected_len
+        seen.extend(task.prompt for task in tasks)
+        cursor = (tasks[-1].created_at, tasks[-1].id)
+
+    assert seen == [f"Task {i}" for i in reversed(range(5))]
+
+
+def test_list_tasks_negative_offset():
+    """Test a negative offset starts at the newest task like get_task_logs."""
+    create_test_tasks([f"Task {i}" for i in range(3)])
+
+    tasks = TaskService.list_tasks(limit=2, offset=-1)
+
+    assert [task.prompt for task in tasks] == ["Task 2", "Task 1"]
+
+
+def test_list_tasks_offset_past_end():
+    """Test a page beyond the last task is empty."""
+    create_test_tasks([f"Task {i}" for i in range(3)])
+
+    tasks = TaskService.list_tasks(limit=2, offset=10)
+
+    assert tasks == []
+
+
+def test_count_tasks_sees_new_tasks():
+    """Test the cached task count is dropped when a task is inserted."""
+    create_test_tasks(["Task 1"])
+    assert TaskService.count_tasks() == 1
+
+    create_test_task(prompt="Task 2")
+    assert TaskService.count_tasks() == 2
 
 
 def test_update_task_status():
@@ -113,94 +178,156 @@ def test_get_task_logs_empty():
     task = create_test_task(prompt="Task without logs")
 
     # Logs should return empty list if file doesn't exist
-    logs, total = TaskService.get_task_logs(task.id)
+    logs = TaskService.get_task_logs(task.id)
+    total = TaskService.count_task_logs(task.id)
 
     assert len(logs) == 0
     assert total == 0
 
 
-def test_get_task_logs_with_pagination(mocker, tmp_path):
+@pytest.mark.io
+def test_get_task_logs_with_pagination(task_logs_dir):
     """Test getting logs with pagination."""
     task = create_test_task(prompt="Task with logs")
 
-    # Create mock JSONL file with 10 messages (one JSON object per line)
-    log_file = tmp_path / "session.jsonl"
-    with open(log_file, "w") as f:
-        for i in range(10):
-            f.write(json.dumps({"type": f"Message{i}", "data": {}}) + "\n")
+    # JSONL file with 10 messages (one JSON object per line)
+    session_log_file(task_logs_dir, task).write_bytes(PAGINATION_LOG)
 
-    mocker.patch("pathlib.Path.exists", return_value=True)
-    # Mock Path to return our temp file path
-    mocker.patch("pathlib.Path.__truediv__", return_value=log_file)
+    assert TaskService.count_task_logs(task.id) == 10
 
     # Get first page
-    logs, total = TaskService.get_task_logs(task.id, limit=5, offset=0)
-    assert len(logs) == 5
-    assert total == 10
-    assert logs[0]["type"] == "Message0"
+    logs_page1 = TaskService.get_task_logs(task.id, limit=5, offset=0)
+    assert len(logs_page1) == 5
+    assert logs_page1[0]["type"] == "Message0"
 
     # Get second page
-    logs, total = TaskService.get_task_logs(task.id, limit=5, offset=5)
-    assert len(logs) == 5
-    assert total == 10
-    assert logs[0]["type"] == "Message5"
+    logs_page2 = TaskService.get_task_logs(task.id, limit=5, offset=5)
+    assert len(logs_page2) == 5
+
+    # Pages are disjoint and together cover the whole file
+    types_page1 = {log["type"] for log in logs_page1}
+    types_page2 = {log["type"] for log in logs_page2}
+    assert types_page1.isdisjoint(types_page2)
+    assert types_page1 | types_page2 == {f"Message{i}" for i in range(10)}
+
 
+@pytest.mark.io
+def test_get_task_logs_negative_offset(task_logs_dir):
+    """Test a negative offset starts at the first line instead of the end."""
+    task = create_test_task(prompt="Task with logs")
+    session_log_file(task_logs_dir, task).write_bytes(PAGINATION_LOG)
+
+    logs = TaskService.get_task_logs(task.id, limit=3, offset=-2)
+
+    assert [log["type"] for log in logs] == ["Message0", "Message1", "Message2"]
 
-def test_get_task_logs_read_error(mocker):
+
+@pytest.mark.io
+def test_get_task_logs_read_error(mocker, task_logs_dir):
     """Test getting logs when file read fails."""
     task = create_test_task(prompt="Task with corrupt logs")
 
-    # Mock file exists but read fails
-    mocker.patch("pathlib.Path.exists", return_value=True)
-    mocker.patch("builtins.open", side_effect=Exception("Disk error"))
+    # File exists but opening it fails
+    session_log_file(task_logs_dir, task).write_bytes(PAGINATION_LOG)
+    mocker.patch.object(Path, "open", side_effect=OSError("Disk error"))
 
     # Should return empty list on error
-    logs, total = TaskService.get_task_logs(task.id)
+    logs = TaskService.get_task_logs(task.id)
+    total = TaskService.count_task_logs(task.id)
 
     assert len(logs) == 0
     assert total == 0
 
 
-def test_get_task_logs_with_empty_lines(mocker, tmp_path):
+@pytest.mark.io
+def test_get_task_logs_with_empty_lines(task_logs_dir):
     """Test getting logs with empty lines in JSONL file."""
     task = create_test_task(prompt="Task with empty lines")
 
-    # Create JSONL file with empty lines
-    log_file = tmp_path / "session.jsonl"
-    with open(log_file, "w") as f:
-        f.write(json.dumps({"type": "Message0", "data": {}}) + "\n")
-        f.write("\n")  # Empty line
-        f.write("   \n")  # Whitespace line
-        f.write(json.dumps({"type": "Message1", "data": {}}) + "\n")
-
-    mocker.patch("pathlib.Path.exists", return_value=True)
-    mocker.patch("pathlib.Path.__truediv__", return_value=log_file)
+    # JSONL file with an empty line and a whitespace-only line
+    session_log_file(task_logs_dir, task).write_bytes(EMPTY_LINES_LOG)
 
-    logs, total = TaskService.get_task_logs(task.id, limit=10, offset=0)
+    logs = TaskService.get_task_logs(task.id, limit=10, offset=0)
+    total = TaskService.count_task_logs(task.id)
     assert len(logs) == 2  # Only valid lines
     assert total == 2  # Empty lines not counted
     assert logs[0]["type"] == "Message0"
     assert logs[1]["type"] == "Message1"
 
 
-def test_get_task_logs_with_invalid_json(mocker, tmp_path):
+@pytest.mark.io
+def test_get_task_logs_with_invalid_json(task_logs_dir):
     """Test getting logs with invalid JSON lines."""
     task = create_test_task(prompt="Task with invalid JSON")
 
-    # Create JSONL file with invalid JSON
-    log_file = tmp_path / "session.jsonl"
-    with open(log_file, "w") as f:
-        f.write(json.dumps({"type": "Message0", "data": {}}) + "\n")
-        f.write("not valid json\n")  # Invalid JSON
-        f.write(json.dumps({"type": "Message1", "data": {}}) + "\n")
-
-    mocker.patch("pathlib.Path.exists", return_value=True)
-    mocker.patch("pathlib.Path.__truediv__", return_value=log_file)
+    # JSONL file with an invalid JSON line between two messages
+    session_log_file(task_logs_dir, task).write_bytes(INVALID_JSON_LOG)
 
-    logs, total = TaskService.get_task_logs(task.id, limit=10, offset=0)
+    logs = TaskService.get_task_logs(task.id, limit=10, offset=0)
+    total = TaskService.count_task_logs(task.id)
     assert len(logs) == 3  # All lines returned
     assert total == 3
     assert logs[0]["type"] == "Message0"
     assert "error" in logs[1]  # Invalid JSON becomes error object
     assert logs[1]["raw"] == "not valid json"
     assert logs[2]["type"] == "Message1"
+
+
+@pytest.mark.io
+def test_get_task_logs_with_invalid_utf8(task_logs_dir):
+    """Test a line with invalid UTF-8 becomes an error object, not a failed read."""
+    task = create_test_task(prompt="Task with invalid UTF-8")
+
+    log_file = session_log_file(task_logs_dir, task)
+    log_file.write_bytes(b'{"type": "Message0"}\n\xff\xfe bad bytes\n')
+
+    logs = TaskService.get_task_logs(task.id, limit=10, offset=0)
+    total = TaskService.count_task_logs(task.id)
+    assert total == 2
+    assert logs[0]["type"] == "Message0"
+    assert logs[1]["error"] == "Failed to parse"
+    assert logs[1]["raw"].endswith("bad bytes")
+
+
+@pytest.mark.io
+def test_get_task_logs_sees_appended_lines(task_logs_dir):
+    """Test the cached line index is rebuilt when the session file grows."""
+    task = create_test_task(prompt="Task still running")
+
+    log_file = session_log_file(task_logs_dir, task)
+    log_file.write_text(json.dumps({"type": "Message0"}) + "\n")
+
+    assert TaskService.count_task_logs(task.id) == 1
+
+    with open(log_file, "a") as f:
+        f.write(json.dumps({"type": "Message1"}) + "\n")
+
+    logs = TaskService.get_task_logs(task.id, limit=10, offset=0)
+    total = TaskService.count_task_logs(task.id)
+    assert total == 2
+    assert logs[1]["type"] == "Message1"
+
+
+@pytest.mark.io
+def test_get_task_logs_evicts_oldest_index(monkeypatch, task_logs_dir):
+    """Test the line index cache drops the oldest file once it is full."""
+    monkeypatch.setattr(task_service, "LOG_INDEX_CACHE_SIZE", 1)
+    monkeypatch.setattr(task_service, "_log_index", {})
+
+    first = create_test_task(prompt="First task")
+    second = create_test_task(prompt="Second task")
+    first_log = session_log_file(task_logs_dir, first)
+    first_log.write_bytes(PAGINATION_LOG)
+    second_log = session_log_file(task_logs_dir, second)
+    second_log.write_bytes(EMPTY_LINES_LOG)
+
+    assert TaskService.count_task_logs(first.id) == 10
+    assert list(task_service._log_index) == [str(first_log)]
+
+    assert TaskService.count_task_logs(second.id) == 2
+    assert list(task_service._log_index) == [str(second_log)]
+
+    # The evicted file is re-indexed on its next read
+    logs = TaskService.get_task_logs(first.id, limit=10, offset=0)
+    assert len(logs) == 10
+    assert list(task_service._log_index) == [str(first_log)]